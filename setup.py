@@ -1,112 +1,429 @@
-from setuptools import setup, find_packages
-import pybind11
+from setuptools import setup
 from pybind11.setup_helpers import Pybind11Extension, build_ext
-import numpy as np
 import sys
 import os
+import re
+import shutil
+import sysconfig
+import threading
+from pathlib import Path
 
-with open("README.md", "r", encoding="utf-8") as fh:
-    long_description = fh.read()
+HERE = Path(__file__).resolve().parent
 
-compile_args = []
-link_args = []
+def get_version():
+    """Read __version__ from the package without importing it."""
+    init_text = (HERE / "src" / "kernel_experience" / "__init__.py").read_text(encoding="utf-8")
+    match = re.search(r'^__version__\s*=\s*[\'"]([^\'"]+)', init_text, re.M)
+    if not match:
+        raise RuntimeError("Unable to find __version__ in src/kernel_experience/__init__.py")
+    return match.group(1)
 
-if sys.platform == 'win32':
 
-    compile_args = ['/MD', '/EHsc']
-    link_args = []
-    
-    
-    if os.getenv('GITHUB_ACTIONS') == 'true':
-        compile_args.insert(0, '/O2')
-        compile_args.append('/GL')  # Whole Program Optimization для CI
-        link_args.append('/LTCG')   # Link Time Code Generation
-        print("Windows CI: /O2 + /GL + /LTCG for maximum optimization")
-    else:
-        compile_args.insert(0, '/O2')
-        compile_args.append('/GL')
-        link_args.append('/LTCG')
-        print("Local Windows: full optimization with LTO")
-    
-    # Python version for linking
-    py_version = f"{sys.version_info.major}{sys.version_info.minor}"
-    link_args.extend([
-        f'/NODEFAULTLIB:python{py_version}t.lib',
-        f'/DEFAULTLIB:python{py_version}.lib'
-    ])
-    
-else:
-    # Unix-like systems (Linux, macOS)
-    compile_args = ['-O3', '-fPIC', '-flto']  # LTO for gcc/clang
-    link_args = ['-flto']
-    
-    # Detect pybind11 version for C++ standard
-    pybind11_version = tuple(map(int, pybind11.__version__.split('.')[:2]))
-    if pybind11_version >= (2, 13):
-        compile_args.append('-std=c++17')
-    else:
-        compile_args.append('-std=c++11')
+# Build environment, read once
+IN_CI = os.environ.get('GITHUB_ACTIONS') == 'true'
+PY_VER = f"{sys.version_info.major}{sys.version_info.minor}"
+IS_X86_64 = sysconfig.get_platform().endswith(('x86_64', 'amd64'))
+
+# Build knobs. Debug info is opt-in; release wheels are always stripped
+DEBUG_SYMBOLS = os.environ.get('KERNEL_EXPERIENCE_DEBUG') == '1'
+NATIVE_ISA = os.environ.get('KERNEL_EXPERIENCE_NATIVE') == '1'
+BASELINE_ISA = os.environ.get('KERNEL_EXPERIENCE_BASELINE') == 'sse2'
+FAST_MATH = os.environ.get('KERNEL_EXPERIENCE_FAST_MATH') == '1'
+
+
+def uses_clang():
+    """Best guess whether the Unix toolchain is clang (PGO and OpenMP differ)."""
+    cc = os.environ.get('CC') or sysconfig.get_config_var('CC') or ''
+    return sys.platform == 'darwin' or 'clang' in cc
+
+
+def optimization_flags(platform, ci, debug=False):
+    """
+    Return (compile_args, link_args) for a release build on `platform`.
+
+    Every extension is built with the same flags: -O3 plus LTO, so the
+    linker can inline across the core/bindings boundary. With `debug`
+    the binaries keep their symbols (-g, /Zi /DEBUG).
+    """
+    if platform == 'win32':
+        compile_args = ['/O2', '/MD', '/EHsc', '/GL']  # /GL: Whole Program Optimization
+        link_args = ['/LTCG']                         # Link Time Code Generation
+        # /fp:fast lets MSVC reassociate the reduction loops, /Qpar enables
+        # its auto-parallelizer. Without /arch it only vectorizes to SSE2;
+        # /arch:AVX2 goes to the runtime-dispatched solver variant below.
+        compile_args.extend(['/fp:fast', '/Qpar'])
+        # OpenMP 2.0 threads (vcomp) plus the `omp simd` reduction pragmas
+        compile_args.append('/openmp:experimental')
+        if ci:
+            print("Windows CI: /O2 + /GL + /LTCG for maximum optimization")
+        else:
+            print("Local Windows: full optimization with LTO")
+        if debug:
+            compile_args.append('/Zi')
+            link_args.append('/DEBUG')
+
+        # Free-threaded CPython: pyconfig.h on Windows cannot detect it, so the
+        # macro must be passed explicitly (it also selects pythonXYt.lib)
+        if sysconfig.get_config_var('Py_GIL_DISABLED'):
+            compile_args.append('/DPy_GIL_DISABLED=1')
+        elif sys.version_info >= (3, 13):
+            # Both import libraries ship side by side since 3.13; pin the GIL one
+            link_args.extend([
+                f'/NODEFAULTLIB:python{PY_VER}t.lib',
+                f'/DEFAULTLIB:python{PY_VER}.lib'
+            ])
+        return compile_args, link_args
+
+    # Unix-like systems (Linux, macOS). Apple clang only knows thin/full LTO
+    # and ld64 rejects the GNU ld options.
+    lto = '-flto=thin' if platform == 'darwin' else '-flto=auto'
+    compile_args = ['-O3', '-fPIC', '-pipe', lto, '-fno-semantic-interposition', '-fvisibility=hidden']
+    link_args = [lto]
+    if platform != 'darwin':
+        link_args.extend(['-Wl,-O1', '-Wl,--as-needed'])
+    if debug:
+        compile_args.append('-g')
+    elif platform != 'darwin':
+        link_args.append('-Wl,-s')
+
+    # The base modules target the baseline ISA so wheels run on any x86-64
+    # CPU; wider SIMD comes from the runtime-dispatched solver variants below.
+    # KERNEL_EXPERIENCE_NATIVE=1 tunes for the build machine (local installs only).
+    if NATIVE_ISA:
+        compile_args.append('-march=native')
+
+    # Let the vectorizer contract to FMA and treat exp/log as pure functions.
+    # -fopenmp-simd only honors the `omp simd` pragmas (no libgomp), which lets
+    # the reduction loops vectorize without -ffast-math.
+    compile_args.extend(['-ffp-contract=fast', '-fno-math-errno', '-fno-trapping-math',
+                         '-fopenmp-simd', '-funroll-loops'])
+    if FAST_MATH:
+        compile_args.append('-ffast-math')
+
+    # Threads for the solver's long reductions. GCC ships libgomp; Apple and
+    # LLVM clang need a separately installed libomp, so they stay serial.
+    if platform.startswith('linux') and not uses_clang():
+        compile_args.append('-fopenmp')
+        link_args.append('-fopenmp')
+
+    return compile_args, link_args
+
+
+compile_args, link_args = optimization_flags(sys.platform, IN_CI, debug=DEBUG_SYMBOLS)
 
 print(f"Compile flags: {compile_args}")
 print(f"Link flags: {link_args}")
 
-# core.cpp
-solver_module = Pybind11Extension(
-    'kernel_experience._solvers_cpp', 
-    sources=['src/kernel_experience/core.cpp'],
-    define_macros=[('BUILD_SOLVERS_MODULE', '1')],
-    include_dirs=[np.get_include()],
-    language='c++',
-    extra_compile_args=compile_args,
-    extra_link_args=link_args,
-)
+# Macro-independent code shared by every extension; compiled once per build
+SHARED_SOURCES = ['src/kernel_experience/core.cpp']
+SHARED_DEPENDS = SHARED_SOURCES + ['src/kernel_experience/core.hpp']
 
-projection_module = Pybind11Extension(
-    'kernel_experience._projection_cpp',
-    sources=['src/kernel_experience/core.cpp'],
-    define_macros=[('BUILD_PROJECTION_MODULE', '1')],
-    include_dirs=[np.get_include()],
-    language='c++',
-    extra_compile_args=compile_args,
-    extra_link_args=link_args,
-)
 
+# Canned workload for --pgo: exercises the solver and projection hot loops.
+# Run in a subprocess with the paths of the two freshly built base modules,
+# followed by `isa=path` for each solver variant. A variant is only trained
+# if this CPU can run it; otherwise it is rebuilt without a profile.
+PGO_TRAINING = """
+import importlib.util
+import sys
+
+import numpy as np
+
+
+def load(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+solvers = load("kernel_experience._solvers_cpp", sys.argv[1])
+projection = load("kernel_experience._projection_cpp", sys.argv[2])
+
+variants = [solvers]
+for arg in sys.argv[3:]:
+    isa, path = arg.split("=", 1)
+    if getattr(solvers, f"cpu_supports_{isa}")():
+        variants.append(load(f"kernel_experience._solvers_cpp_{isa}", path))
+    else:
+        print(f"PGO: this CPU lacks {isa}, _solvers_cpp_{isa} is built without a profile")
+
+kernels = [
+    lambda t: 1.5 * np.exp(-1.5 * t),
+    lambda t: np.power(np.maximum(t, 1e-12), -0.3) / 1.298,
+    lambda t: np.power(np.maximum(t, 1e-12), -0.4) * np.exp(-0.3 * t) / 1.489,
+    lambda t: np.sin(2.0 * t) * np.exp(-0.3 * t) + 0.5 * np.cos(1.5 * t),
+]
+for kernel in kernels:
+    for method in ("trapezoidal", "simpson"):
+        for n_points in (200, 1000, 3000):
+            K_row = kernel(np.linspace(0.0, 10.0, n_points))
+            for module in variants:
+                t, x = module.solve_volterra(K_row, 10.0, n_points, 1.0, method)
+            n = projection.fast_n(x, 1.0, 0.8, False)
+            projection.monotonic_min(n)
+            projection.fast_envelope(x)
+"""
+
+
+def pgo_flags(profile_dir):
+    """
+    Return the (compile_args, link_args) pairs for both PGO stages.
+
+    Stage one instruments the binaries, stage two rebuilds them from the
+    profile recorded by PGO_TRAINING.
+    """
+    if sys.platform == 'win32':
+        # /GL is always on, so MSVC only needs the linker switches
+        return ([], ['/GENPROFILE']), ([], ['/USEPROFILE'])
+    generate = [f'-fprofile-generate={profile_dir}']
+    use = [f'-fprofile-use={profile_dir}']
+    if not uses_clang():
+        use += ['-fprofile-correction', '-Wno-missing-profile']
+    return (generate, generate), (use, use)
+
+
+def find_compiler_launcher():
+    """Return the path to ccache/sccache if one is installed, else None."""
+    # ccache cannot wrap MSVC, sccache can wrap both toolchains
+    candidates = ['sccache'] if sys.platform == 'win32' else ['ccache', 'sccache']
+    for name in candidates:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+class BuildExt(build_ext):
+    """
+    build_ext for the C++ backend.
+
+    Compiles the shared core once for all extensions and routes compiler
+    invocations through ccache/sccache when one is installed. With --pgo
+    the extensions are built twice around a training run, e.g.
+    ``python setup.py build_ext --pgo bdist_wheel``.
+    """
+
+    user_options = build_ext.user_options + [
+        ('pgo', None, "profile-guided build: instrument, run a training workload, rebuild"),
+    ]
+    boolean_options = build_ext.boolean_options + ['pgo']
+
+    def initialize_options(self):
+        super().initialize_options()
+        self.pgo = False
+
+    def finalize_options(self):
+        super().finalize_options()
+        # Extensions are independent, build them concurrently unless -j was given
+        if self.parallel is None:
+            self.parallel = os.cpu_count() or 2
+
+        # Imported here so metadata-only commands (egg_info, --version, ...)
+        # do not pay for importing numpy
+        import numpy
+        import pybind11
+
+        self.include_dirs.append(numpy.get_include())
+
+        if sys.platform != 'win32':
+            # Pick the C++ standard from pybind11's pre-parsed version tuple
+            cxx_std = '-std=c++17' if pybind11.version_info[:2] >= (2, 13) else '-std=c++11'
+            for ext in self.extensions:
+                if cxx_std not in ext.extra_compile_args:
+                    ext.extra_compile_args.append(cxx_std)
+
+    def run(self):
+        if self.pgo:
+            self._run_pgo()
+        else:
+            super().run()
+        if not DEBUG_SYMBOLS:
+            self._strip_extensions()
+
+    def _run_pgo(self):
+        profile_dir = os.path.abspath(os.path.join(self.build_temp, 'pgo'))
+        generate, use = pgo_flags(profile_dir)
+
+        print("PGO stage 1: instrumented build")
+        self._run_with_flags(*generate)
+
+        print("PGO: running training workload")
+        modules = [self.get_ext_fullpath(ext.name) for ext in self.extensions]
+        if not all(os.path.exists(path) for path in modules[:2]):
+            # An optional extension failed; do not ship instrumented binaries
+            print("PGO: instrumented build incomplete, rebuilding without profiles")
+            self.force = True
+            self._run_with_flags([], [])
+            return
+        # Solver variants that built are passed as isa=path (e.g. avx2=..._solvers_cpp_avx2.so)
+        variants = [f"{ext.name.rsplit('_', 1)[1]}={path}"
+                    for ext, path in zip(self.extensions[2:], modules[2:]) if os.path.exists(path)]
+        self.spawn([sys.executable, '-c', PGO_TRAINING] + modules[:2] + variants)
+        if sys.platform != 'win32' and uses_clang():
+            profdata = ['xcrun', 'llvm-profdata'] if sys.platform == 'darwin' else ['llvm-profdata']
+            raw = [os.path.join(profile_dir, f) for f in os.listdir(profile_dir) if f.endswith('.profraw')]
+            self.spawn(profdata + ['merge', '-o', os.path.join(profile_dir, 'default.profdata')] + raw)
+
+        print("PGO stage 2: optimized rebuild")
+        self.force = True
+        self._run_with_flags(*use)
+
+    def _run_with_flags(self, compile_extra, link_extra):
+        # run() replaces self.compiler (a name) with the compiler object it creates
+        compiler_option = self.compiler
+        saved = [(ext.extra_compile_args, ext.extra_link_args) for ext in self.extensions]
+        for ext in self.extensions:
+            ext.extra_compile_args = list(ext.extra_compile_args) + compile_extra
+            ext.extra_link_args = list(ext.extra_link_args) + link_extra
+        try:
+            super().run()
+        finally:
+            self.compiler = compiler_option
+            for ext, (cargs, largs) in zip(self.extensions, saved):
+                ext.extra_compile_args, ext.extra_link_args = cargs, largs
+
+    def _strip_extensions(self):
+        """Drop leftover symbols from the built modules (smaller wheels, faster import)."""
+        strip = shutil.which('strip')
+        if sys.platform == 'win32' or not strip:
+            return
+        # ld64 has no -s, so macOS relies on this step alone
+        strip_args = ['-x'] if sys.platform == 'darwin' else ['--strip-unneeded']
+        for ext in self.extensions:
+            path = self.get_ext_fullpath(ext.name)
+            if os.path.exists(path):
+                self.spawn([strip] + strip_args + [path])
+
+    def build_extensions(self):
+        launcher = find_compiler_launcher()
+        if launcher:
+            # Hash paths relative to the checkout so caches survive new clones
+            os.environ.setdefault('CCACHE_BASEDIR', str(HERE))
+            os.environ.setdefault('CCACHE_SLOPPINESS', 'pch_defines,time_macros')
+            self._install_launcher(launcher)
+            print(f"Compiler cache: {launcher}")
+        else:
+            print("Compiler cache: none found (install ccache or sccache to speed up rebuilds)")
+        self._shared_objects = {}
+        self._shared_lock = threading.Lock()
+        super().build_extensions()
+
+    def build_extension(self, ext):
+        if not self._is_stale(ext):
+            return super().build_extension(ext)
+        # Attach the shared objects for this build only (PGO builds twice)
+        extra_objects = ext.extra_objects
+        try:
+            # Compiled here so failures fall under the optional-extension handling
+            ext.extra_objects = self._compile_shared(ext) + list(extra_objects or [])
+            super().build_extension(ext)
+        finally:
+            ext.extra_objects = extra_objects
+
+    def _is_stale(self, ext):
+        target = self.get_ext_fullpath(ext.name)
+        if self.force or not os.path.exists(target):
+            return True
+        built = os.path.getmtime(target)
+        return any(os.path.getmtime(dep) > built for dep in list(ext.sources) + list(ext.depends))
+
+    def _compile_shared(self, ext):
+        """Compile SHARED_SOURCES once per distinct flag set and reuse the objects."""
+        key = (tuple(ext.extra_compile_args or []), tuple(ext.include_dirs or []))
+        with self._shared_lock:
+            if key not in self._shared_objects:
+                output_dir = os.path.join(self.build_temp, f'shared{len(self._shared_objects)}')
+                self._shared_objects[key] = self.compiler.compile(
+                    SHARED_SOURCES,
+                    output_dir=output_dir,
+                    include_dirs=ext.include_dirs,
+                    debug=self.debug,
+                    extra_postargs=ext.extra_compile_args,
+                    depends=ext.depends,
+                )
+            return self._shared_objects[key]
+
+    def _install_launcher(self, launcher):
+        compiler = self.compiler
+        if compiler.compiler_type == 'msvc':
+            # MSVC spawns [cc] + args, so wrap spawn() once cl.exe is resolved
+            if not compiler.initialized:
+                compiler.initialize()
+            spawn = compiler.spawn
+
+            def cached_spawn(cmd, **kwargs):
+                if cmd and cmd[0] == compiler.cc:
+                    cmd = [launcher] + list(cmd)
+                return spawn(cmd, **kwargs)
+
+            compiler.spawn = cached_spawn
+            return
+
+        # Newer setuptools compile .cpp sources with compiler_so_cxx when it exists
+        for attr in ('compiler_so', 'compiler_so_cxx', 'compiler_cxx'):
+            cmd = getattr(compiler, attr, None)
+            if cmd and os.path.basename(cmd[0]) not in ('ccache', 'sccache'):
+                setattr(compiler, attr, [launcher] + list(cmd))
+
+
+def make_extension(name, bindings, extra_compile_args=(), depends=(), **kwargs):
+    """
+    Create one C++ extension with the project-wide flags.
+
+    Every extension links the shared core (SHARED_SOURCES); `bindings` is the
+    shim that holds only its PYBIND11_MODULE block. Extensions are optional:
+    if the compiler fails, setuptools warns and the package installs with
+    its pure-Python fallbacks instead of aborting the whole pip install.
+    """
+    kwargs.setdefault('optional', True)
+    return Pybind11Extension(
+        name,
+        sources=[bindings],
+        depends=SHARED_DEPENDS + list(depends),
+        language='c++',
+        extra_compile_args=list(compile_args) + list(extra_compile_args),
+        extra_link_args=list(link_args),
+        **kwargs
+    )
+
+
+# No py_limited_api/abi3 here: pybind11 needs the full CPython C API, so
+# wheels stay per-interpreter (rebuilds are cheap with ccache, see BuildExt)
+solver_module = make_extension('kernel_experience._solvers_cpp',
+                               'src/kernel_experience/solvers_module.cpp')
+projection_module = make_extension('kernel_experience._projection_cpp',
+                                   'src/kernel_experience/projection_module.cpp')
+ext_modules = [solver_module, projection_module]
+
+# Extra solver builds with AVX2/FMA and 512-bit vectors, picked at import time
+# by solvers.py on CPUs that support them (not for native builds, and not with
+# KERNEL_EXPERIENCE_BASELINE=sse2)
+WITH_ISA_VARIANTS = IS_X86_64 and not (NATIVE_ISA or BASELINE_ISA)
+if WITH_ISA_VARIANTS:
+    avx2_flags = ['/arch:AVX2'] if sys.platform == 'win32' else ['-mavx2', '-mfma', '-mtune=skylake']
+    ext_modules.append(make_extension(
+        'kernel_experience._solvers_cpp_avx2',
+        'src/kernel_experience/solvers_module_avx2.cpp',
+        extra_compile_args=avx2_flags,
+        depends=['src/kernel_experience/solvers_module.cpp'],
+    ))
+# The AVX-512 probe has no MSVC implementation, so Windows stops at AVX2
+if WITH_ISA_VARIANTS and sys.platform != 'win32':
+    ext_modules.append(make_extension(
+        'kernel_experience._solvers_cpp_avx512',
+        'src/kernel_experience/solvers_module_avx512.cpp',
+        extra_compile_args=['-mavx512f', '-mavx512dq', '-mfma', '-mprefer-vector-width=512'],
+        depends=['src/kernel_experience/solvers_module.cpp'],
+    ))
+
+# Static metadata and dependencies live in pyproject.toml ([project])
 setup(
-    name="kernel-experience-tools",
-    version="1.2.0",  
-    author="Artem Vozmishchev",
-    author_email="xbrutallololx@gmail.com",
-    description="Library for projecting memory kernels to experience functions",
-    long_description=long_description,
-    long_description_content_type="text/markdown",
-    url="https://github.com/BRUTALLOLOL/kernel-experience-tools",
-    license="MIT", 
-    package_dir={"": "src"},
-    packages=find_packages(where="src"),
-    python_requires=">=3.7",
-    install_requires=[
-        "numpy>=1.19.0", 
-        "scipy>=1.6.0",
-        "matplotlib>=3.3.0",
-    ],
-    ext_modules=[solver_module, projection_module],
-    cmdclass={"build_ext": build_ext},
-    classifiers=[
-        "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.7",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
-        "Programming Language :: Python :: 3.10",
-        "Programming Language :: Python :: 3.11",
-        "Programming Language :: Python :: 3.12",
-        "Programming Language :: Python :: 3.13",
-        "License :: OSI Approved :: MIT License",
-        "Operating System :: OS Independent",
-        "Intended Audience :: Science/Research",
-        "Topic :: Scientific/Engineering :: Mathematics",
-        "Topic :: Scientific/Engineering :: Physics",
-    ],
+    version=get_version(),
+    package_dir={"kernel_experience": "src/kernel_experience"},
+    packages=["kernel_experience"],
+    ext_modules=ext_modules,
+    cmdclass={"build_ext": BuildExt},
     include_package_data=True,
     zip_safe=False,
 )
-
@@ -5,14 +5,18 @@ Kernel-Experience Tools: A library for projecting memory kernels to experience f
 # Use try-except for compatibility
 try:
     # Absolute imports (preferred)
-    from kernel_experience.kernel import Kernel
-    from kernel_experience.projection import project_kernel_to_n, project_to_envelope_n, compute_accuracy
-    from kernel_experience.solvers import solve_volterra
+    from kernel_experience.kernel import Kernel, KernelBatch
+    from kernel_experience.projection import (project_kernel_to_n, project_kernel_to_n_fft,
+                                              project_to_envelope_n,
+                                              compute_accuracy, compute_accuracy_log)
+    from kernel_experience.solvers import solve_volterra, solve_volterra_batch, solve_volterra_cq
 except ImportError:
     # Relative imports as fallback
-    from .kernel import Kernel
-    from .projection import project_kernel_to_n, project_to_envelope_n, compute_accuracy
-    from .solvers import solve_volterra
+    from .kernel import Kernel, KernelBatch
+    from .projection import (project_kernel_to_n, project_kernel_to_n_fft,
+                             project_to_envelope_n,
+                             compute_accuracy, compute_accuracy_log)
+    from .solvers import solve_volterra, solve_volterra_batch, solve_volterra_cq
 
 __version__ = "1.2.0"
 __author__ = "Artem Vozmishchev"
@@ -20,10 +24,15 @@ __email__ = "xbrutallololx@gmail.com"
 
 __all__ = [
     "Kernel",
+    "KernelBatch",
     "project_kernel_to_n",
+    "project_kernel_to_n_fft",
     "project_to_envelope_n",
     "compute_accuracy",
-    "solve_volterra"
+    "compute_accuracy_log",
+    "solve_volterra",
+    "solve_volterra_batch",
+    "solve_volterra_cq"
 ]
 
 
@@ -0,0 +1,38 @@
+"""
+Optional numba support for the pure-Python fallbacks.
+
+numba is only imported when the C++ extensions are not built: with them the
+compiled fallbacks are not needed, and importing numba costs more than the
+Python paths it would replace.
+"""
+
+try:
+    from . import _solvers_cpp  # noqa: F401
+    HAS_CPP = True
+except ImportError:
+    HAS_CPP = False
+
+HAS_NUMBA = False
+if not HAS_CPP:
+    try:
+        import numba  # noqa: F401
+        HAS_NUMBA = True
+    except ImportError:
+        pass
+
+
+def cached(decorator, *args, **options):
+    """
+    Apply a numba `decorator` (njit, guvectorize, ...) with the on-disk cache.
+
+    With explicit signatures the function is compiled, or loaded from the
+    cache, right away. A cache that cannot be loaded - e.g. one written while
+    the package was imported under another module path - must not break the
+    import, so the function is then compiled without it.
+    """
+    def wrap(func):
+        try:
+            return decorator(*args, cache=True, **options)(func)
+        except Exception:
+            return decorator(*args, **options)(func)
+    return wrap
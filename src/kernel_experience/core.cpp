@@ -18,18 +18,74 @@
 #define M_PI 3.14159265358979323846
 #endif
 
-#include <pybind11/pybind11.h>
-#include <pybind11/numpy.h>
+#include "core.hpp"
+
 #include <pybind11/functional.h>
 #include <pybind11/stl.h>
-#include <vector>
 #include <complex>
 #include <algorithm>
-#include <string>
+#include <cstdlib>
+#include <new>
 #include <stdexcept>
-#include <cstdint>
+#ifdef _WIN32
+#include <malloc.h>
+#endif
+#ifdef _MSC_VER
+#include <intrin.h>  // __cpuid / _xgetbv for the ISA probe
+#endif
+
+// ============================================================================
+// 64-BYTE ALIGNED SCRATCH BUFFERS
+// ============================================================================
+
+/**
+ * std::vector allocator returning cache-line (64-byte) aligned storage, so
+ * AVX-512 loads of the solver buffers never straddle two lines.
+ * (C++17 aligned new is not available under the -std=c++11 fallback.)
+ */
+template <typename T, std::size_t Align = 64>
+struct AlignedAllocator {
+    using value_type = T;
+    template <typename U> struct rebind { using other = AlignedAllocator<U, Align>; };
 
-namespace py = pybind11;
+    AlignedAllocator() noexcept = default;
+    template <typename U>
+    AlignedAllocator(const AlignedAllocator<U, Align>&) noexcept {}
+
+    T* allocate(std::size_t n) {
+        void* p = nullptr;
+#ifdef _WIN32
+        p = _aligned_malloc(n * sizeof(T), Align);
+#else
+        if (posix_memalign(&p, Align, n * sizeof(T)) != 0) p = nullptr;
+#endif
+        if (!p) throw std::bad_alloc();
+        return static_cast<T*>(p);
+    }
+
+    void deallocate(T* p, std::size_t) noexcept {
+#ifdef _WIN32
+        _aligned_free(p);
+#else
+        std::free(p);
+#endif
+    }
+};
+
+template <typename T, typename U, std::size_t A>
+bool operator==(const AlignedAllocator<T, A>&, const AlignedAllocator<U, A>&) { return true; }
+template <typename T, typename U, std::size_t A>
+bool operator!=(const AlignedAllocator<T, A>&, const AlignedAllocator<U, A>&) { return false; }
+
+template <typename T>
+using aligned_vector = std::vector<T, AlignedAllocator<T>>;
+
+// Tell GCC/Clang a pointer from aligned_vector is 64-byte aligned
+#ifdef __GNUC__
+#define ASSUME_ALIGNED_64(p) static_cast<decltype(p)>(__builtin_assume_aligned((p), 64))
+#else
+#define ASSUME_ALIGNED_64(p) (p)
+#endif
 
 // ============================================================================
 // BATCH KERNEL EVALUATION - MINIMIZES PYTHON CALL OVERHEAD
@@ -66,103 +122,136 @@ py::array_t<double> evaluate_kernel_batch(
 // OPTIMIZED VOLTERRA SOLVER WITH BATCH EVALUATION
 // ============================================================================
 
+// Rows per block (and columns per tile) of the solver loop: a 2*256-value
+// window of K plus 256 values of x stay well inside L1
+constexpr int64_t SOLVER_TILE = 256;
+// Rows per thread chunk, and the history length below which the solver
+// stays single-threaded (the fork/join would cost more than the sums)
+constexpr int64_t SOLVER_ROW_CHUNK = 32;
+constexpr int64_t SOLVER_PARALLEL_MIN = 512;
+
 /**
- * Solve Volterra equation using C++ with batch kernel evaluation.
- * 
+ * Solve Volterra equation on a precomputed kernel row.
+ *
  * Algorithm:
- * 1. Generate all unique tau = t[i] - t[j] values
- * 2. Evaluate kernel on all unique tau in ONE Python call
- * 3. Use precomputed K values for integration
- * 
- * This reduces Python calls from O(n²) to O(n) and enables vectorization.
+ * 1. K(t[i] - t[j]) = K((i-j)*dt), so every kernel value needed is in
+ *    K_row[k] = K(k*dt), evaluated by the caller in one vectorized call
+ * 2. The solver reads K_row[i-j] directly (Toeplitz), with no Python
+ *    callbacks and no n x n matrix
+ *
+ * This keeps the whole time-stepping loop inside C++. T is float or double;
+ * the float instantiation doubles the SIMD width of the reductions.
  */
+template <typename T>
 py::tuple solve_volterra_batch(
-    py::function kernel_func,
+    py::array_t<T, py::array::c_style | py::array::forcecast> K_row,
     double t_max,
     int64_t n_points,
     double x0,
-    const std::string& method = "trapezoidal"
+    const std::string& method
 ) {
+    if (K_row.ndim() != 1 || K_row.shape(0) < n_points) {
+        throw std::runtime_error(
+            "K_row must be a 1-D array with at least n_points values"
+        );
+    }
+    const T* K = K_row.data();
+
     // Create time grid
-    std::vector<double> t(n_points);
-    std::vector<double> x(n_points, 0.0);
+    aligned_vector<T> t(n_points);
+    aligned_vector<T> x_buf(n_points, T(0));
+    T* x = ASSUME_ALIGNED_64(x_buf.data());
     
     double dt = t_max / (n_points - 1);
     for (int64_t i = 0; i < n_points; ++i) {
-        t[i] = i * dt;
+        t[i] = static_cast<T>(i * dt);
     }
     
-    x[0] = x0;
-    
-    // Generate all unique tau values needed
-    // For Volterra equation, we need K(t[i] - t[j]) for all i >= j
-    // These are just multiples of dt: 0, dt, 2*dt, ..., (n_points-1)*dt
-    std::vector<double> unique_tau(n_points);
-    for (int64_t k = 0; k < n_points; ++k) {
-        unique_tau[k] = k * dt;
-    }
-    
-    // Evaluate kernel on all unique tau in ONE Python call
-    py::array_t<double> tau_array({n_points}, unique_tau.data());
-    py::array_t<double> K_unique = evaluate_kernel_batch(kernel_func, tau_array);
-    auto K_ptr = K_unique.unchecked<1>();
-    
-    // Pre-allocate K matrix in column-major order for better cache locality
-    // We only need lower triangular, but storing full is simpler and still cache-friendly
-    std::vector<double> K_matrix(n_points * n_points, 0.0);
-    for (int64_t i = 0; i < n_points; ++i) {
-        for (int64_t j = 0; j <= i; ++j) {
-            // K(t[i] - t[j]) = K((i-j)*dt) = K_unique[i-j]
-            K_matrix[i * n_points + j] = K_ptr[i - j];
-        }
-    }
+    x[0] = static_cast<T>(x0);
     
     bool use_trapezoidal = (method == "trapezoidal");
+    // Interior (weight 1.0) terms start at j=1 for trapezoidal, j=0 otherwise
+    const int64_t j_first = use_trapezoidal ? 1 : 0;
     
-    // Main integration loop - now working with precomputed K values
-    for (int64_t i = 1; i < n_points; ++i) {
-        double integral = 0.0;
-        double* K_row = &K_matrix[i * n_points];
+    // Main integration loop - K(t[i] - t[j]) is K[i - j]
+    //
+    // Rows are processed in blocks of SOLVER_TILE. Interior terms whose x[j]
+    // is known before the block starts are summed tile by tile for all rows
+    // of the block, so the K and x slices they read stay in L1; only the
+    // last few terms of each row are left to the sequential recurrence.
+    aligned_vector<T> history_buf(SOLVER_TILE);
+    T* history = ASSUME_ALIGNED_64(history_buf.data());
+    for (int64_t ib = 1; ib < n_points; ib += SOLVER_TILE) {
+        const int64_t ie = std::min(ib + SOLVER_TILE, n_points);
+        // Every row i >= ib has interior terms for all j < j_known
+        const int64_t j_known = use_trapezoidal ? ib - 1 : ib;
         
-        if (use_trapezoidal) {
-            // Trapezoidal rule - manually unrolled for better vectorization
-            // First and last terms have weight 0.5, interior terms weight 1.0
-            
-            // First term (j=0)
-            integral += 0.5 * dt * K_row[0] * x[0];
-            
-            // Interior terms
-            #ifdef __GNUC__
-            #pragma GCC ivdep  // Tell compiler it can vectorize
-            #endif
-            for (int64_t j = 1; j < i-1; ++j) {
-                integral += dt * K_row[j] * x[j];
+        std::fill(history, history + SOLVER_TILE, T(0));
+        // The history sums of different rows are independent: with OpenMP,
+        // chunks of rows go to different threads once there is enough
+        // history per row to pay for waking the thread team
+        #pragma omp parallel for schedule(static) if(j_known > SOLVER_PARALLEL_MIN)
+        for (int64_t ic = ib; ic < ie; ic += SOLVER_ROW_CHUNK) {
+            const int64_t ice = std::min(ic + SOLVER_ROW_CHUNK, ie);
+            for (int64_t jb = j_first; jb < j_known; jb += SOLVER_TILE) {
+                const int64_t je = std::min(jb + SOLVER_TILE, j_known);
+                for (int64_t i = ic; i < ice; ++i) {
+                    const T* K_i = K + i;  // K_i[-j] = K[i - j]
+                    T sum = 0;
+                    // Reassociating the sum is what lets this vectorize
+                    #pragma omp simd reduction(+:sum)
+                    for (int64_t j = jb; j < je; ++j) {
+                        sum += K_i[-j] * x[j];
+                    }
+                    history[i - ib] += sum;
+                }
             }
+        }
+        
+        const int64_t j_start = std::max(j_known, j_first);
+        for (int64_t i = ib; i < ie; ++i) {
+            const T* K_i = K + i;
+            T sum = history[i - ib];
             
-            // Last term (j=i-1) - only if i>1
-            if (i > 1) {
-                integral += 0.5 * dt * K_row[i-1] * x[i-1];
-            }
-        } else {
-            // Simple rectangular rule - can be fully vectorized
-            #ifdef __GNUC__
-            #pragma GCC ivdep
-            #endif
-            for (int64_t j = 0; j < i; ++j) {
-                integral += dt * K_row[j] * x[j];
+            if (use_trapezoidal) {
+                // Trapezoidal rule: first and last terms have weight 0.5,
+                // interior terms weight 1.0
+                #pragma omp simd reduction(+:sum)
+                for (int64_t j = j_start; j < i-1; ++j) {
+                    sum += K_i[-j] * x[j];
+                }
+                double integral = dt * sum + 0.5 * dt * K_i[0] * x[0];
+                
+                // Last term (j=i-1) - only if i>1
+                if (i > 1) {
+                    integral += 0.5 * dt * K_i[-(i-1)] * x[i-1];
+                }
+                x[i] = static_cast<T>(x0 - integral);
+            } else {
+                // Simple rectangular rule
+                #pragma omp simd reduction(+:sum)
+                for (int64_t j = j_start; j < i; ++j) {
+                    sum += K_i[-j] * x[j];
+                }
+                x[i] = static_cast<T>(x0 - dt * sum);
             }
         }
-        
-        x[i] = x0 - integral;
     }
     
     // Convert to Python objects
     return py::make_tuple(
-        py::array_t<double>({n_points}, t.data()),
-        py::array_t<double>({n_points}, x.data())
+        py::array_t<T>({n_points}, t.data()),
+        py::array_t<T>({n_points}, x)
     );
 }
 
+template py::tuple solve_volterra_batch<float>(
+    py::array_t<float, py::array::c_style | py::array::forcecast>,
+    double, int64_t, double, const std::string&);
+template py::tuple solve_volterra_batch<double>(
+    py::array_t<double, py::array::c_style | py::array::forcecast>,
+    double, int64_t, double, const std::string&);
+
 // ============================================================================
 // FAST N(T) COMPUTATION WITH VECTORIZED OPERATIONS
 // ============================================================================
@@ -270,56 +359,44 @@ std::vector<double> generate_time_grid(double t_max, int64_t n_points) {
 }
 
 // ============================================================================
-// MODULE DEFINITIONS
+// RUNTIME ISA PROBE
 // ============================================================================
 
-#if defined(BUILD_SOLVERS_MODULE)
-
 /**
- * Solvers module - optimized Volterra solvers
+ * Check whether the AVX2 build of the solver can run on this machine
+ * (AVX2 plus FMA, which that build also enables).
+ * GCC/Clang and MSVC on x86 can answer; everything else reports false.
  */
-PYBIND11_MODULE(_solvers_cpp, m) {
-    m.doc() = "Optimized C++ solvers with batch kernel evaluation";
-    
-    m.def("solve_volterra", &solve_volterra_batch,
-          "Fast Volterra solver with batch kernel evaluation (O(n) Python calls)",
-          py::arg("kernel_func"),
-          py::arg("t_max"),
-          py::arg("n_points"),
-          py::arg("x0") = 1.0,
-          py::arg("method") = "trapezoidal");
-    
-    // Also expose the batch evaluator for advanced use
-    m.def("evaluate_kernel_batch", &evaluate_kernel_batch,
-          "Evaluate kernel on a batch of time differences in one Python call",
-          py::arg("kernel_func"),
-          py::arg("tau_array"));
+bool cpu_supports_avx2() {
+#if defined(__GNUC__) && (defined(__x86_64__) || defined(__i386__))
+    __builtin_cpu_init();
+    return __builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma");
+#elif defined(_MSC_VER) && (defined(_M_X64) || defined(_M_IX86))
+    int info[4];
+    __cpuid(info, 1);
+    const bool fma = (info[2] & (1 << 12)) != 0;
+    const bool osxsave = (info[2] & (1 << 27)) != 0;
+    const bool avx = (info[2] & (1 << 28)) != 0;
+    // The OS must save the YMM registers on context switches (XCR0 bits 1-2)
+    if (!(fma && osxsave && avx) || (_xgetbv(0) & 0x6) != 0x6) {
+        return false;
+    }
+    __cpuidex(info, 7, 0);
+    return (info[1] & (1 << 5)) != 0;  // EBX bit 5: AVX2
+#else
+    return false;
+#endif
 }
 
-#elif defined(BUILD_PROJECTION_MODULE)
-
 /**
- * Projection module - vectorized projection algorithms
+ * Check whether the AVX-512 build of the solver can run on this machine.
+ * Only GCC/Clang on x86 can answer; everything else reports false.
  */
-PYBIND11_MODULE(_projection_cpp, m) {
-    m.doc() = "Vectorized C++ projection algorithms";
-    
-    m.def("fast_n", &fast_n_vectorized,
-          "Vectorized computation of n(t) = log(x/x0)/log(lambda)",
-          py::arg("x"),
-          py::arg("x0"),
-          py::arg("lambda_param"),
-          py::arg("return_complex") = false);
-    
-    m.def("fast_envelope", &fast_envelope_vectorized,
-          "Fast O(n) envelope extraction (moving maximum)",
-          py::arg("x"));
-    
-    m.def("monotonic_min", &monotonic_min_vectorized,
-          "Fast O(n) monotonic minimum accumulation",
-          py::arg("n"));
-}
-
+bool cpu_supports_avx512() {
+#if defined(__GNUC__) && (defined(__x86_64__) || defined(__i386__))
+    __builtin_cpu_init();
+    return __builtin_cpu_supports("avx512f") && __builtin_cpu_supports("avx512dq");
 #else
-#error "Must define either BUILD_SOLVERS_MODULE or BUILD_PROJECTION_MODULE"
+    return false;
 #endif
+}
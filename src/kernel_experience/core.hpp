@@ -0,0 +1,60 @@
+/**
+ * core.hpp
+ * Declarations for the shared C++ core of kernel-experience-tools.
+ *
+ * core.cpp is compiled once and linked into both extension modules;
+ * the module shims (solvers_module.cpp, projection_module.cpp) only
+ * contain the pybind11 bindings.
+ */
+
+#ifndef KERNEL_EXPERIENCE_CORE_HPP
+#define KERNEL_EXPERIENCE_CORE_HPP
+
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+#include <cstdint>
+#include <string>
+#include <vector>
+
+namespace py = pybind11;
+
+// Batch kernel evaluation
+py::array_t<double> evaluate_kernel_batch(
+    py::function kernel_func,
+    py::array_t<double> tau_array
+);
+
+// Volterra solver on a precomputed kernel row K_row[k] = K(k*dt);
+// instantiated for float and double in core.cpp
+template <typename T>
+py::tuple solve_volterra_batch(
+    py::array_t<T, py::array::c_style | py::array::forcecast> K_row,
+    double t_max,
+    int64_t n_points,
+    double x0,
+    const std::string& method = "trapezoidal"
+);
+
+// Projection helpers
+py::object fast_n_vectorized(
+    py::array_t<double> x_array,
+    double x0,
+    double lambda_param,
+    bool return_complex
+);
+
+py::array_t<double> fast_envelope_vectorized(
+    py::array_t<double> x_array
+);
+
+py::array_t<double> monotonic_min_vectorized(
+    py::array_t<double> n_array
+);
+
+std::vector<double> generate_time_grid(double t_max, int64_t n_points);
+
+// Runtime ISA probes
+bool cpu_supports_avx2();
+bool cpu_supports_avx512();
+
+#endif  // KERNEL_EXPERIENCE_CORE_HPP
@@ -4,7 +4,69 @@ Kernel class for memory kernels K(t).
 
 import numpy as np
 from typing import Callable, Union, List
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from scipy.special import gamma as _sp_gamma, gammainc as _sp_gammainc
+from ._numba import HAS_NUMBA, cached
+
+# Compiled kernel evaluation only pays off when numba vectorizes exp/pow
+# through Intel SVML; without it NumPy's own SIMD loops are faster.
+HAS_NUMBA_SVML = False
+if HAS_NUMBA:
+    import numba
+    HAS_NUMBA_SVML = bool(numba.config.USING_SVML)
+
+
+if HAS_NUMBA_SVML:
+    from numba import guvectorize
+
+    @cached(guvectorize, ['void(f4[:], f4, f4[:])', 'void(f8[:], f8, f8[:])'],
+            '(n),()->(n)', nopython=True, fastmath=True)
+    def _exponential_gufunc(t, gamma, out):
+        for i in range(t.shape[0]):
+            out[i] = gamma * np.exp(-gamma * max(t[i], 0.0))
+
+    @cached(guvectorize, ['void(f4[:], f4, f4, f4, f4[:])', 'void(f8[:], f8, f8, f8, f8[:])'],
+            '(n),(),(),()->(n)', nopython=True, fastmath=True)
+    def _tempered_power_gufunc(t, prefactor, exponent, beta, out):
+        for i in range(t.shape[0]):
+            t_safe = max(t[i], 1e-12)
+            out[i] = prefactor * t_safe ** exponent * np.exp(-beta * t_safe)
+
+
+def _gufunc_kernel(gufunc, *params) -> Callable:
+    """Wrap a '(n)->(n)' kernel gufunc so it also accepts scalars and lists."""
+    params = tuple(float(p) for p in params)  # Python floats keep float32 input float32
+
+    def func(t):
+        t = np.asarray(t)
+        if t.dtype != np.float32:
+            t = t.astype(np.float64, copy=False)
+        if t.ndim == 0:
+            return gufunc(t[None], *params)[0]
+        return gufunc(t, *params)
+
+    return func
+
+
+def _power_func(exponent: float) -> Callable:
+    """
+    Return f(t) = t**exponent for t > 0.
+
+    Half-integer and small integer exponents map to sqrt/divide/multiply,
+    which are several times cheaper than the generic np.power.
+    """
+    if exponent == -0.5:
+        return lambda t: 1.0 / np.sqrt(t)
+    if exponent == 0.5:
+        return np.sqrt
+    if exponent == 0:
+        # Keep float32 input float32, like the other branches
+        return lambda t: np.ones_like(t, dtype=np.result_type(np.asarray(t).dtype, np.float32))
+    if exponent == 1:
+        return lambda t: t
+    if exponent == -1:
+        return lambda t: 1.0 / t
+    return lambda t: np.power(t, exponent)
 
 
 @dataclass
@@ -20,10 +82,20 @@ class Kernel:
         Human-readable name of the kernel.
     params : dict, optional
         Dictionary of kernel parameters.
+    laplace : callable, optional
+        Laplace transform F(s) = ∫₀^∞ e^{-st} K(t) dt, for complex s with Re s > 0.
+        Only set it when 1 + F(s) has no zeros with Re s ≥ 0 (no growing
+        modes); the FFT solver relies on a decaying solution.
+    integral : callable, optional
+        Running integral ∫₀ᵗ K(τ) dτ.
     """
     func: Callable[[float], float]
     name: str = "CustomKernel"
     params: dict = None
+    laplace: Callable = None
+    integral: Callable = None
+    # Set only by the factory methods; `name` is free-form and user-settable
+    _family: str = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if self.params is None:
@@ -36,6 +108,40 @@ class Kernel:
     def __repr__(self):
         return f"Kernel(name='{self.name}', params={self.params})"
 
+    @property
+    def family(self) -> str:
+        """Factory that built this kernel ('Exponential', 'PowerLaw', ...), None if custom."""
+        return self._family
+
+    @property
+    def is_convolution(self) -> bool:
+        """True if `laplace` and `integral` are known, so the FFT solver applies."""
+        return self.laplace is not None and self.integral is not None
+
+    @staticmethod
+    def batch_eval(kernels: List["Kernel"], t: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        Evaluate several kernels on one grid; returns shape (len(kernels), len(t)).
+
+        Factory-built kernels of the same family (Kernel.family) are evaluated
+        together as one KernelBatch broadcast; custom kernels are called one by one.
+        """
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        out = np.empty((len(kernels), t.shape[0]))
+        families = {}
+        for i, kernel in enumerate(kernels):
+            fields = _BATCH_FAMILIES.get(kernel.family, {})
+            if fields and all(param in kernel.params for param, _ in fields.values()):
+                families.setdefault(kernel.family, []).append(i)
+            else:
+                out[i] = kernel(t)
+
+        for family, rows in families.items():
+            params = {field: [kernels[i].params[param] for i in rows]
+                      for field, (param, _) in _BATCH_FAMILIES[family].items()}
+            out[rows] = KernelBatch(family, **params)(t)
+        return out
+
     # ----- Lambda conversion utilities -----
     @staticmethod
     def convert_lambda(n: float, lambda_from: float, lambda_to: float) -> float:
@@ -89,47 +195,150 @@ class Kernel:
     @classmethod
     def exponential(cls, gamma: float = 1.0):
         """Exponential kernel: K(t) = γ * e^{-γt}"""
+        if HAS_NUMBA_SVML:
+            func = _gufunc_kernel(_exponential_gufunc, gamma)
+        else:
+            def func(t):
+                return gamma * np.exp(-gamma * np.maximum(t, 0))
 
-        def func(t):
-            return gamma * np.exp(-gamma * np.maximum(t, 0))
-
-        return cls(func=func, name="Exponential", params={"gamma": gamma})
+        kernel = cls(func=func, name="Exponential", params={"gamma": gamma})
+        kernel._family = "Exponential"
+        if gamma > 0:
+            # γ ≤ 0 gives a growing solution, outside the FFT solver's reach
+            kernel.laplace = lambda s: gamma / (s + gamma)
+            kernel.integral = lambda t: -np.expm1(-gamma * np.maximum(t, 0))
+        return kernel
 
     @classmethod
     def power_law(cls, alpha: float = 0.5, gamma: float = 1.0):
         """Power-law kernel: K(t) = γ * t^(α-1) / Γ(α)"""
-        from scipy.special import gamma as gamma_func
-        prefactor = gamma / gamma_func(alpha)
+        prefactor = float(gamma / _sp_gamma(alpha))  # Python float keeps float32 t float32
+        if HAS_NUMBA_SVML:
+            func = _gufunc_kernel(_tempered_power_gufunc, prefactor, alpha - 1, 0.0)
+        else:
+            power = _power_func(alpha - 1)
 
-        def func(t):
-            t_safe = np.where(t > 0, t, 1e-12)  # Избегаем деления на ноль
-            return prefactor * np.power(t_safe, alpha - 1)
+            def func(t):
+                t_safe = np.maximum(t, 1e-12)  # Избегаем деления на ноль
+                return prefactor * power(t_safe)
 
-        return cls(func=func, name="PowerLaw",
-                   params={"alpha": alpha, "gamma": gamma})
+        kernel = cls(func=func, name="PowerLaw",
+                     params={"alpha": alpha, "gamma": gamma})
+        kernel._family = "PowerLaw"
+        if gamma > 0 and 0 < alpha < 2:
+            # Roots of s^α = -γ lie in Re s < 0 only for α < 2
+            kernel.laplace = lambda s: gamma * s ** -alpha
+            kernel.integral = lambda t: prefactor / alpha * np.power(np.maximum(t, 0), alpha)
+        return kernel
 
     @classmethod
     def mittag_leffler(cls, alpha: float = 0.7, beta: float = 1.0):
         """Mittag-Leffler kernel: K(t) = t^(α-1) * E_{α,α}(-t^α)"""
-        from scipy.special import gamma
+        inv_gamma_alpha = 1.0 / _sp_gamma(alpha)
 
         def func(t):
             # Simplified version - in practice use ml() from scipy
             t_alpha = np.power(t, alpha)
-            return np.power(t, alpha - 1) * np.exp(-t_alpha) / gamma(alpha)
+            return np.power(t, alpha - 1) * np.exp(-t_alpha) * inv_gamma_alpha
 
-        return cls(func=func, name="MittagLeffler",
-                   params={"alpha": alpha, "beta": beta})
+        kernel = cls(func=func, name="MittagLeffler",
+                     params={"alpha": alpha, "beta": beta})
+        kernel._family = "MittagLeffler"
+        return kernel
 
     @classmethod
     def tempered_power_law(cls, alpha: float = 0.6, beta: float = 0.3, gamma: float = 1.0):
         """Tempered power-law: K(t) = γ * t^(α-1) * e^{-βt} / Γ(α)"""
-        from scipy.special import gamma as gamma_func
-        prefactor = gamma / gamma_func(alpha)
+        prefactor = float(gamma / _sp_gamma(alpha))  # Python float keeps float32 t float32
+        if HAS_NUMBA_SVML:
+            func = _gufunc_kernel(_tempered_power_gufunc, prefactor, alpha - 1, beta)
+        else:
+            power = _power_func(alpha - 1)
 
-        def func(t):
-            t_safe = np.where(t > 0, t, 1e-12)
-            return prefactor * np.power(t_safe, alpha - 1) * np.exp(-beta * t_safe)
+            def func(t):
+                t_safe = np.maximum(t, 1e-12)
+                return prefactor * power(t_safe) * np.exp(-beta * t_safe)
+
+        kernel = cls(func=func, name="TemperedPowerLaw",
+                     params={"alpha": alpha, "beta": beta, "gamma": gamma})
+        kernel._family = "TemperedPowerLaw"
+        if gamma > 0 and beta >= 0 and 0 < alpha < 2:
+            # β < 0 is an exponentially growing kernel: no FFT solver
+            if beta > 0:
+                # ∫₀ᵗ = γ β^{-α} P(α, βt), with P the regularized lower incomplete gamma
+                def integral(t):
+                    return gamma * beta ** -alpha * _sp_gammainc(alpha, beta * np.maximum(t, 0))
+            else:
+                def integral(t):
+                    return prefactor / alpha * np.power(np.maximum(t, 0), alpha)
+            kernel.laplace = lambda s: gamma * (s + beta) ** -alpha
+            kernel.integral = integral
+        return kernel
+
+
+# KernelBatch field -> (Kernel.params key, factory default) for each family
+_BATCH_FAMILIES = {
+    "Exponential": {"gammas": ("gamma", 1.0)},
+    "PowerLaw": {"alphas": ("alpha", 0.5), "gammas": ("gamma", 1.0)},
+    "TemperedPowerLaw": {"alphas": ("alpha", 0.6), "betas": ("beta", 0.3), "gammas": ("gamma", 1.0)},
+}
+
+
+@dataclass
+class KernelBatch:
+    """
+    Many kernels of one built-in family, stored as parameter arrays.
+
+    Evaluating the batch is one broadcast NumPy expression instead of a loop
+    over Kernel objects, which is what parameter sweeps need.
+
+    Parameters
+    ----------
+    family : str
+        'Exponential', 'PowerLaw' or 'TemperedPowerLaw'.
+    alphas, betas, gammas : array_like, optional
+        Parameters of each kernel, broadcast to a common shape (M,).
+        Unused ones are ignored; missing ones take the factory defaults.
+    """
+    family: str
+    alphas: np.ndarray = None
+    betas: np.ndarray = None
+    gammas: np.ndarray = None
+
+    def __post_init__(self):
+        if self.family not in _BATCH_FAMILIES:
+            raise ValueError(f"Unknown family: {self.family}. "
+                             f"Use one of {sorted(_BATCH_FAMILIES)}.")
+        defaults = {name: default for name, (_, default) in _BATCH_FAMILIES[self.family].items()}
+        names = ("alphas", "betas", "gammas")
+        values = [np.atleast_1d(np.asarray(
+            getattr(self, name) if getattr(self, name) is not None else defaults.get(name, np.nan),
+            dtype=float)) for name in names]
+        for name, value in zip(names, np.broadcast_arrays(*values)):
+            setattr(self, name, value.copy())
+
+    def __len__(self) -> int:
+        return self.gammas.shape[0]
+
+    def __call__(self, t: Union[float, np.ndarray]) -> np.ndarray:
+        """Evaluate every kernel at times t; returns shape (M, len(t))."""
+        t = np.atleast_1d(np.asarray(t, dtype=float))[None, :]
+        gammas = self.gammas[:, None]
+        if self.family == "Exponential":
+            return gammas * np.exp(-gammas * np.maximum(t, 0))
+
+        alphas = self.alphas[:, None]
+        t_safe = np.maximum(t, 1e-12)
+        out = (gammas / _sp_gamma(alphas)) * np.power(t_safe, alphas - 1)
+        if self.family == "TemperedPowerLaw":
+            out *= np.exp(-self.betas[:, None] * t_safe)
+        return out
 
-        return cls(func=func, name="TemperedPowerLaw",
-                   params={"alpha": alpha, "beta": beta, "gamma": gamma})
+    def __getitem__(self, i: int) -> Kernel:
+        """The i-th kernel of the batch as a regular Kernel."""
+        if self.family == "Exponential":
+            return Kernel.exponential(gamma=self.gammas[i])
+        if self.family == "PowerLaw":
+            return Kernel.power_law(alpha=self.alphas[i], gamma=self.gammas[i])
+        return Kernel.tempered_power_law(alpha=self.alphas[i], beta=self.betas[i],
+                                         gamma=self.gammas[i])
@@ -0,0 +1,33 @@
+/**
+ * projection_module.cpp
+ * pybind11 bindings for the _projection_cpp extension.
+ */
+
+#include "core.hpp"
+
+/**
+ * Projection module - vectorized projection algorithms
+ */
+#ifdef Py_GIL_DISABLED
+// Free-threaded build: the module keeps no global state, don't re-enable the GIL
+PYBIND11_MODULE(_projection_cpp, m, py::mod_gil_not_used()) {
+#else
+PYBIND11_MODULE(_projection_cpp, m) {
+#endif
+    m.doc() = "Vectorized C++ projection algorithms";
+    
+    m.def("fast_n", &fast_n_vectorized,
+          "Vectorized computation of n(t) = log(x/x0)/log(lambda)",
+          py::arg("x"),
+          py::arg("x0"),
+          py::arg("lambda_param"),
+          py::arg("return_complex") = false);
+    
+    m.def("fast_envelope", &fast_envelope_vectorized,
+          "Fast O(n) envelope extraction (moving maximum)",
+          py::arg("x"));
+    
+    m.def("monotonic_min", &monotonic_min_vectorized,
+          "Fast O(n) monotonic minimum accumulation",
+          py::arg("n"));
+}
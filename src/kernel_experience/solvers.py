@@ -3,28 +3,215 @@ Numerical solvers for Volterra integral equations.
 Includes optional C++ backend for 10x speedup.
 """
 
+import importlib
 import numpy as np
 from typing import Callable, Tuple, Union
-from .kernel import Kernel
+from .kernel import Kernel, KernelBatch
+from ._numba import HAS_NUMBA, cached
 
 # Try to import the C++ module (compiled with pybind11)
 try:
-    from ._solvers_cpp import solve_volterra as solve_volterra_cpp
+    from . import _solvers_cpp
     HAS_CPP = True
 except ImportError:
     HAS_CPP = False
 
+# The base module targets the baseline ISA; prefer the widest SIMD build
+# of the solver that this CPU supports
+if HAS_CPP:
+    for _isa in ("avx512", "avx2"):
+        if getattr(_solvers_cpp, f"cpu_supports_{_isa}")():
+            try:
+                _solvers_cpp = importlib.import_module(f"._solvers_cpp_{_isa}", __package__)
+                break
+            except ImportError:
+                pass
+
+if HAS_CPP:
+    solve_volterra_cpp = _solvers_cpp.solve_volterra
+
+# Numba JIT for the fallback solver; HAS_NUMBA is only set when the C++
+# module is not built (see _numba)
+if HAS_NUMBA:
+    from numba import njit
+
+# Rows per block (and columns per tile) in the compiled trapezoidal loop
+_SOLVER_TILE = 256
+
+if HAS_NUMBA:
+    # Explicit signatures compile eagerly at import (and come from the
+    # on-disk cache afterwards), so the first solve is not charged the JIT
+    # warm-up. Arrays are the contiguous buffers from _aligned_zeros.
+    @cached(njit, ['f8[::1](f8[::1], f8[::1], f8, f8, b1)',
+                   'f4[::1](f4[::1], f4[::1], f8, f8, b1)'],
+            fastmath=True)
+    def _solve_volterra_numba(K_row, x, dt, x0, simpson):
+        """Compiled twin of the pure-Python trapezoidal/Simpson recurrence, filling x."""
+        n_points = x.shape[0]
+        x[0] = x0
+        if simpson:
+            for i in range(1, n_points):
+                if i % 2 == 0:
+                    acc = K_row[i] * x[0] + K_row[0] * x[i - 1]
+                    for j in range(1, i):
+                        weight = 4.0 if j % 2 == 1 else 2.0
+                        acc += weight * K_row[i - j] * x[j]
+                    x[i] = x0 - acc * dt / 3.0
+                else:
+                    acc = 0.5 * K_row[i] * x[0]
+                    for j in range(1, i - 1):
+                        acc += K_row[i - j] * x[j]
+                    if i > 1:
+                        acc += 0.5 * K_row[1] * x[i - 1]
+                    x[i] = x0 - acc * dt
+            return x
+
+        # Trapezoidal: rows go in blocks; interior terms with x[j] already
+        # known before the block are summed tile by tile so the K and x
+        # slices stay in L1, then each row finishes its last few terms
+        history = np.empty(_SOLVER_TILE, K_row.dtype)
+        for ib in range(1, n_points, _SOLVER_TILE):
+            ie = min(ib + _SOLVER_TILE, n_points)
+            j_known = ib - 1
+            history[:] = 0.0
+            for jb in range(1, j_known, _SOLVER_TILE):
+                je = min(jb + _SOLVER_TILE, j_known)
+                for i in range(ib, ie):
+                    acc = 0.0
+                    for j in range(jb, je):
+                        acc += K_row[i - j] * x[j]
+                    history[i - ib] += acc
+            for i in range(ib, ie):
+                acc = history[i - ib] + 0.5 * K_row[i] * x[0]
+                for j in range(max(j_known, 1), i - 1):
+                    acc += K_row[i - j] * x[j]
+                if i > 1:
+                    acc += 0.5 * K_row[1] * x[i - 1]
+                x[i] = x0 - acc * dt
+        return x
+
+
+def _aligned_zeros(n: int, dtype=np.float64, align: int = 64) -> np.ndarray:
+    """
+    Zero-filled 1-D array whose data starts on an `align`-byte boundary.
+
+    NumPy only guarantees 16 bytes; 64 keeps AVX-512 loads of the solver
+    buffers from straddling cache lines.
+    """
+    dtype = np.dtype(dtype)
+    nbytes = n * dtype.itemsize
+    buf = np.zeros(nbytes + align, dtype=np.uint8)
+    offset = -buf.ctypes.data % align
+    return buf[offset:offset + nbytes].view(dtype)
+
+
+def _exponential_rates(params: dict):
+    """Exponential(γ): K(t) = γ e^{-γt}."""
+    return params["gamma"], params["gamma"]
+
+
+def _unit_alpha_rates(params: dict):
+    """Power-law families at α = 1 reduce to K(t) = γ e^{-βt} (β = 0 if untempered)."""
+    if params.get("alpha") != 1:
+        return None
+    return params["gamma"], params.get("beta", 0.0)
+
+
+# Kernels of the form K(t) = g e^{-bt}, keyed by Kernel.family. Only the
+# factories set it, so a custom kernel named "Exponential" still has its own
+# func solved. Each entry maps the kernel params to (g, b), or None if these
+# params need the generic solver.
+_FAST_KERNELS = {
+    "Exponential": _exponential_rates,
+    "PowerLaw": _unit_alpha_rates,
+    "TemperedPowerLaw": _unit_alpha_rates,
+}
+
+
+def _solve_exponential_kernel(t: np.ndarray, x0: float, g: float, b: float) -> np.ndarray:
+    """
+    Exact solution of x(t) = x0 - ∫₀ᵗ g e^{-b(t-τ)} x(τ) dτ.
+
+    The exponential memory turns the equation into a linear ODE, which gives
+    x(t) = x0 (b + g e^{-(b+g)t}) / (b + g) in O(N).
+    """
+    rate = b + g
+    return x0 * (b + g * np.exp(-rate * t)) / rate
+
+
+def _trapezoid_integral(K_row: np.ndarray, x: np.ndarray, i: int, dt: float) -> float:
+    """
+    Trapezoidal sum of K(t[i] - t[j]) * x[j] over j < i as one dot product.
+
+    Row i of the Toeplitz kernel matrix is K_row[i:0:-1]; the first and last
+    nodes get weight 1/2 (a single node when i == 1).
+    """
+    weights = K_row[i:0:-1].copy()
+    weights[0] *= 0.5
+    if i > 1:
+        weights[-1] *= 0.5
+    return dt * np.dot(weights, x[:i])
+
+
+def _solve_trapezoid_toeplitz(K_row: np.ndarray, dt: float, x0: float):
+    """
+    Solve the whole trapezoidal recurrence as one Toeplitz system.
+
+    With the known x[0] = x0 moved to the right-hand side, the unknowns
+    x[1:] satisfy L x[1:] = b, where L is unit lower-triangular Toeplitz with
+    first column c = [1, dt/2 K[1], dt K[2], dt K[3], ...] and
+    b = x0 - dt/2 K[1:] x0. The inverse of L is again lower-triangular
+    Toeplitz (the power series 1/c), built by Newton doubling with FFT
+    Toeplitz products in O(N log N). Returns None if the residual is not
+    small, so the caller can fall back to the step-by-step loop.
+    """
+    from scipy.linalg import matmul_toeplitz
+
+    m = K_row.shape[0] - 1
+    column = dt * K_row[:-1].astype(np.float64)
+    column[0] = 1.0
+    if m > 1:
+        column[1] *= 0.5
+    rhs = x0 - 0.5 * dt * x0 * K_row[1:].astype(np.float64)
+
+    def lower_matmul(col, vec):
+        row = np.zeros_like(col)
+        row[0] = col[0]
+        return matmul_toeplitz((col, row), vec, check_finite=False)
+
+    with np.errstate(all='ignore'):
+        inverse = np.ones(1)
+        size = 1
+        while size < m:
+            size = min(2 * size, m)
+            padded = np.zeros(size)
+            padded[:inverse.shape[0]] = inverse
+            correction = -lower_matmul(column[:size], padded)
+            correction[0] += 2.0
+            inverse = lower_matmul(padded, correction)
+
+        solution = lower_matmul(inverse, rhs)
+        if not np.all(np.isfinite(solution)):
+            return None
+        residual = lower_matmul(column, solution) - rhs
+    if np.max(np.abs(residual)) > 1e-10 * max(np.max(np.abs(rhs)), abs(x0)):
+        return None
+    return solution
+
 
 def solve_volterra(kernel: Union[Kernel, Callable],
                    t_max: float = 10.0,
                    n_points: int = 1000,
                    x0: float = 1.0,
-                   method: str = 'trapezoidal') -> Tuple[np.ndarray, np.ndarray]:
+                   method: str = 'trapezoidal',
+                   dtype=np.float64) -> Tuple[np.ndarray, np.ndarray]:
     """
     Solve x(t) = x0 - ∫₀ᵗ K(t-τ) x(τ) dτ.
 
     If the C++ module is available, it will be used for better performance.
-    Falls back to pure Python implementation automatically.
+    Falls back to pure Python implementation automatically. Built-in kernels
+    of the form K(t) = g e^{-bt} (exponential, and power laws with α = 1) are
+    solved exactly in O(N) and ignore `method`.
 
     Parameters
     ----------
@@ -38,6 +225,10 @@ def solve_volterra(kernel: Union[Kernel, Callable],
         Initial condition.
     method : str
         Integration method ('trapezoidal' or 'simpson').
+    dtype : np.float64 or np.float32
+        Floating-point type of the grid, kernel values and solution.
+        float32 halves memory traffic and doubles the SIMD width when
+        single precision is enough.
 
     Returns
     -------
@@ -46,59 +237,210 @@ def solve_volterra(kernel: Union[Kernel, Callable],
     x : np.ndarray
         Solution x(t).
     """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"Unsupported dtype: {dtype}. Use float32 or float64.")
+    t = np.linspace(0, t_max, n_points, dtype=dtype)
+
     # Extract the callable function from Kernel object if needed
     if isinstance(kernel, Kernel):
         kernel_func = kernel.func
+
+        # Exponential-type kernels have a closed-form solution
+        rates = _FAST_KERNELS.get(kernel.family, lambda params: None)(kernel.params)
+        if rates is not None and rates[0] + rates[1] > 0:
+            return t, _solve_exponential_kernel(t, x0, *rates).astype(dtype, copy=False)
     else:
         kernel_func = kernel
 
+    # K(t[i] - t[j]) depends only on the lag i - j, so one vectorized call
+    # on the grid gives every kernel value either backend needs
+    K_row = _aligned_zeros(n_points, dtype)
+    K_row[:] = kernel_func(t)
+
     # Use C++ version if available (much faster)
     if HAS_CPP:
-        return solve_volterra_cpp(kernel_func, t_max, n_points, x0, method)
+        return solve_volterra_cpp(K_row, t_max, n_points, x0, method)
 
-    # Pure Python fallback implementation
-    t = np.linspace(0, t_max, n_points)
     dt = t[1] - t[0]
-    x = np.zeros(n_points)
-    x[0] = x0
+    x = _aligned_zeros(n_points, dtype)
+    if HAS_NUMBA and method in ('trapezoidal', 'simpson'):
+        return t, _solve_volterra_numba(K_row, x, dt, x0, method == 'simpson')
 
-    # Precompute kernel values for efficiency
-    K_vals = np.zeros((n_points, n_points))
-    for i in range(n_points):
-        for j in range(i + 1):
-            K_vals[i, j] = kernel_func(t[i] - t[j])
+    # Pure Python fallback implementation. Row i of the kernel matrix,
+    # K(t[i] - t[j]), is read straight from K_row; no N x N matrix is built.
+    x[0] = x0
 
     # Solve using specified method
     if method == 'trapezoidal':
-        for i in range(1, n_points):
-            integral = 0.0
-            for j in range(i):
-                weight = 0.5 if (j == 0 or j == i - 1) else 1.0
-                integral += weight * K_vals[i, j] * x[j] * dt
-            x[i] = x0 - integral
+        solution = _solve_trapezoid_toeplitz(K_row, dt, x0)
+        if solution is not None:
+            x[1:] = solution
+        else:
+            for i in range(1, n_points):
+                x[i] = x0 - _trapezoid_integral(K_row, x, i, dt)
 
     elif method == 'simpson':
+        simpson_weights = np.where(np.arange(n_points) % 2 == 1, 4.0, 2.0)
         for i in range(1, n_points):
             if i % 2 == 0:  # Simpson requires even number of intervals
-                integral = K_vals[i, 0] * x[0] + K_vals[i, i] * x[i - 1]
-                for j in range(1, i):
-                    weight = 4.0 if j % 2 == 1 else 2.0
-                    integral += weight * K_vals[i, j] * x[j]
+                integral = K_row[i] * x[0] + K_row[0] * x[i - 1]
+                integral += np.dot(simpson_weights[1:i] * K_row[i - 1:0:-1], x[1:i])
                 integral *= dt / 3.0
                 x[i] = x0 - integral
             else:
                 # Fall back to trapezoidal for odd intervals
-                integral = 0.0
-                for j in range(i):
-                    weight = 0.5 if (j == 0 or j == i - 1) else 1.0
-                    integral += weight * K_vals[i, j] * x[j] * dt
-                x[i] = x0 - integral
+                x[i] = x0 - _trapezoid_integral(K_row, x, i, dt)
     else:
         raise ValueError(f"Unknown method: {method}. Use 'trapezoidal' or 'simpson'.")
 
     return t, x
 
 
+def solve_volterra_cq(kernel: Kernel,
+                      t_max: float = 10.0,
+                      n_points: int = 1000,
+                      x0: float = 1.0,
+                      dtype=np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Solve x(t) = x0 - ∫₀ᵗ K(t-τ) x(τ) dτ in O(N log N) by convolution quadrature.
+
+    Needs a kernel with a known Laplace transform F(s) and running integral
+    K₁(t) = ∫₀ᵗ K (Kernel.is_convolution). Writing x = x0 + u gives
+    u = -x0 K₁ - K * u with u(0) = 0, and Lubich's BDF2 convolution
+    quadrature turns the discrete problem into generating functions:
+
+        U(ζ) (1 + F(δ(ζ)/dt)) = -x0 Σₙ K₁(tₙ) ζⁿ,   δ(ζ) = (1-ζ) + (1-ζ)²/2.
+
+    U is evaluated on the circle |ζ| = ρ and its Taylor coefficients uₙ are
+    recovered with one FFT. The weak singularity of power-law kernels is
+    handled through F, so this is second-order accurate where sampling K
+    on the grid is not. Exponential-type kernels use their exact solution.
+
+    Parameters
+    ----------
+    kernel : Kernel
+        Memory kernel with `laplace` and `integral` set.
+    t_max, n_points, x0, dtype
+        As in solve_volterra.
+
+    Returns
+    -------
+    t : np.ndarray
+        Time grid.
+    x : np.ndarray
+        Solution x(t).
+    """
+    from scipy import fft
+
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"Unsupported dtype: {dtype}. Use float32 or float64.")
+    if not kernel.is_convolution:
+        raise ValueError(f"Kernel {kernel.name} has no Laplace transform / running integral; "
+                         f"use solve_volterra.")
+    t = np.linspace(0, t_max, n_points, dtype=dtype)
+
+    rates = _FAST_KERNELS.get(kernel.family, lambda params: None)(kernel.params)
+    if rates is not None and rates[0] + rates[1] > 0:
+        return t, _solve_exponential_kernel(t, x0, *rates).astype(dtype, copy=False)
+
+    t64 = t.astype(np.float64)
+    dt = t64[1] - t64[0]
+    # A 4x longer contour with ρ^L = eps^0.8 balances aliasing (ρ^L) against
+    # the ρ^-n amplification of round-off, keeping uₙ accurate to ~1e-12.
+    n_fft = fft.next_fast_len(4 * n_points)
+    rho = np.finfo(np.float64).eps ** (0.8 / n_fft)
+    scale = rho ** np.arange(n_points)
+
+    one_minus_zeta = 1.0 - rho * np.exp(2j * np.pi * np.arange(n_fft) / n_fft)
+    delta = one_minus_zeta * (1.0 + 0.5 * one_minus_zeta)
+
+    # Σₙ K₁(tₙ) ζₖⁿ for all contour points ζₖ = ρ e^{2πik/L}
+    rhs = np.zeros(n_fft)
+    rhs[:n_points] = kernel.integral(t64) * scale
+    U = fft.ifft(rhs, workers=-1)
+    U *= -x0 * n_fft
+    U /= 1.0 + kernel.laplace(delta / dt)
+
+    u = fft.fft(U, overwrite_x=True, workers=-1)[:n_points].real
+    u /= n_fft * scale
+    u[0] = 0.0
+    u += x0
+    return t, u.astype(dtype, copy=False)
+
+
+def solve_volterra_batch(kernels: KernelBatch,
+                         t_max: float = 10.0,
+                         n_points: int = 1000,
+                         x0: float = 1.0,
+                         method: str = 'trapezoidal') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Solve the Volterra equation for every kernel of a KernelBatch at once.
+
+    All M kernel rows come from one broadcast evaluation, and each time step
+    advances the M solutions together, so the Python loop runs N times
+    instead of M·N. As in solve_volterra, rows with an exponential-type
+    kernel use their exact solution and skip the loop.
+
+    Parameters
+    ----------
+    kernels : KernelBatch
+        Batch of M kernels.
+    t_max, n_points, x0, method
+        As in solve_volterra.
+
+    Returns
+    -------
+    t : np.ndarray
+        Time grid, shape (N,).
+    x : np.ndarray
+        Solutions, shape (M, N); row m solves kernels[m].
+    """
+    if method not in ('trapezoidal', 'simpson'):
+        raise ValueError(f"Unknown method: {method}. Use 'trapezoidal' or 'simpson'.")
+
+    t = np.linspace(0, t_max, n_points)
+    dt = t[1] - t[0]
+    x_all = np.empty((len(kernels), n_points))
+
+    rates_of = _FAST_KERNELS.get(kernels.family, lambda params: None)
+    generic = []
+    for m in range(len(kernels)):
+        rates = rates_of(kernels[m].params)
+        if rates is not None and rates[0] + rates[1] > 0:
+            x_all[m] = _solve_exponential_kernel(t, x0, *rates)
+        else:
+            generic.append(m)
+    if not generic:
+        return t, x_all
+
+    # Reversed rows: K[:, i - j] for ascending j is a contiguous slice of K_rev
+    K = kernels(t)[generic]
+    K_rev = np.ascontiguousarray(K[:, ::-1])
+    last = n_points - 1
+    simpson_weights = np.where(np.arange(n_points) % 2 == 1, 4.0, 2.0)
+
+    x = np.zeros((len(generic), n_points))
+    x[:, 0] = x0
+    for i in range(1, n_points):
+        if method == 'simpson' and i % 2 == 0:
+            integral = K[:, i] * x0 + K[:, 0] * x[:, i - 1]
+            integral += np.einsum('mj,mj,j->m', K_rev[:, last - i + 1:last],
+                                  x[:, 1:i], simpson_weights[1:i])
+            x[:, i] = x0 - integral * dt / 3.0
+        else:
+            # Trapezoidal: weight 1/2 on j = 0 and j = i - 1
+            integral = 0.5 * K[:, i] * x0
+            integral += np.einsum('mj,mj->m', K_rev[:, last - i + 1:last - 1], x[:, 1:i - 1])
+            if i > 1:
+                integral += 0.5 * K[:, 1] * x[:, i - 1]
+            x[:, i] = x0 - integral * dt
+
+    x_all[generic] = x
+    return t, x_all
+
+
 # Keep the original function signature for backward compatibility
 # But now it's just a wrapper around the improved version
 solve_volterra_original = solve_volterra
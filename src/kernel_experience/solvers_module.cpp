@@ -0,0 +1,56 @@
+/**
+ * solvers_module.cpp
+ * pybind11 bindings for the _solvers_cpp extension.
+ *
+ * Also compiled (via solvers_module_avx2.cpp / solvers_module_avx512.cpp)
+ * under other module names for the AVX2 and AVX-512 builds of the solver.
+ */
+
+#include "core.hpp"
+
+#ifndef SOLVERS_MODULE_NAME
+#define SOLVERS_MODULE_NAME _solvers_cpp
+#endif
+
+/**
+ * Solvers module - optimized Volterra solvers
+ */
+#ifdef Py_GIL_DISABLED
+// Free-threaded build: the module keeps no global state, don't re-enable the GIL
+PYBIND11_MODULE(SOLVERS_MODULE_NAME, m, py::mod_gil_not_used()) {
+#else
+PYBIND11_MODULE(SOLVERS_MODULE_NAME, m) {
+#endif
+    m.doc() = "Optimized C++ Volterra solvers working on precomputed kernel values";
+    
+    // pybind11's first pass over the overloads does no conversion, so a
+    // float32 row reaches the float overload whatever the order. The order
+    // only matters on the converting pass: float64 is registered first so
+    // ints, lists and other dtypes are converted to double, not float.
+    m.def("solve_volterra", &solve_volterra_batch<double>,
+          "Fast Volterra solver on a precomputed kernel row K_row[k] = K(k*dt)",
+          py::arg("K_row"),
+          py::arg("t_max"),
+          py::arg("n_points"),
+          py::arg("x0") = 1.0,
+          py::arg("method") = "trapezoidal");
+    m.def("solve_volterra", &solve_volterra_batch<float>,
+          "Single-precision overload for float32 kernel rows",
+          py::arg("K_row"),
+          py::arg("t_max"),
+          py::arg("n_points"),
+          py::arg("x0") = 1.0,
+          py::arg("method") = "trapezoidal");
+    
+    // Also expose the batch evaluator for advanced use
+    m.def("evaluate_kernel_batch", &evaluate_kernel_batch,
+          "Evaluate kernel on a batch of time differences in one Python call",
+          py::arg("kernel_func"),
+          py::arg("tau_array"));
+
+    // Let Python pick the AVX2 or AVX-512 build at import time
+    m.def("cpu_supports_avx2", &cpu_supports_avx2,
+          "True if the CPU supports AVX2 and FMA");
+    m.def("cpu_supports_avx512", &cpu_supports_avx512,
+          "True if the CPU (and OS) support AVX-512F and AVX-512DQ");
+}
@@ -0,0 +1,10 @@
+/**
+ * solvers_module_avx2.cpp
+ * The _solvers_cpp bindings built as _solvers_cpp_avx2.
+ *
+ * setup.py compiles this shim (and the shared core) with AVX2/FMA flags;
+ * solvers.py imports it only when cpu_supports_avx2() is true.
+ */
+
+#define SOLVERS_MODULE_NAME _solvers_cpp_avx2
+#include "solvers_module.cpp"
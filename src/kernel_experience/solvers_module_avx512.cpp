@@ -0,0 +1,10 @@
+/**
+ * solvers_module_avx512.cpp
+ * The _solvers_cpp bindings built as _solvers_cpp_avx512.
+ *
+ * setup.py compiles this shim (and the shared core) with AVX-512 flags;
+ * solvers.py imports it only when cpu_supports_avx512() is true.
+ */
+
+#define SOLVERS_MODULE_NAME _solvers_cpp_avx512
+#include "solvers_module.cpp"
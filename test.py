@@ -5,9 +5,19 @@ Validates projection algorithms, kernel classes, and accuracy metrics.
 
 import sys
 import os
+import io
+import math
 import numpy as np
-import matplotlib.pyplot as plt
-from time import time
+from time import perf_counter_ns
+from functools import lru_cache
+from contextlib import nullcontext, redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from numba import njit, vectorize
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
 
 # Add project directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -15,6 +25,9 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 # Import the library
 try:
     from src.kernel_experience import Kernel, project_kernel_to_n, project_to_envelope_n, compute_accuracy
+    from src.kernel_experience import compute_accuracy_log
+    from src.kernel_experience import KernelBatch, solve_volterra, solve_volterra_batch
+    from src.kernel_experience import solve_volterra_cq, project_kernel_to_n_fft
 
     print("✅ Library imported successfully")
     print(f"Kernel module: {Kernel.__module__}")
@@ -22,6 +35,57 @@ except ImportError as e:
     print(f"❌ Import error: {e}")
     sys.exit(1)
 
+# Set to True to see plots (matplotlib is only imported then)
+PLOT_ENABLED = False
+
+
+# Custom kernels used by tests 4 and 6. With numba they are compiled ufuncs,
+# so each evaluation is one fused loop without NumPy temporaries.
+if HAS_NUMBA:
+    @vectorize(['float64(float64)'], fastmath=True, cache=True)
+    def oscillatory_kernel(t):
+        return math.sin(2.0 * t) * math.exp(-0.3 * t) + 0.5 * math.cos(1.5 * t)
+
+    @vectorize(['float64(float64)'], fastmath=True, cache=True)
+    def discontinuous_kernel(t):
+        """Kernel that changes behavior at t=2 and t=5."""
+        if t < 2:
+            return math.exp(-0.5 * t)
+        if t < 5:
+            return 0.5 * math.exp(-0.2 * t)
+        return 0.1 * math.exp(-0.1 * t)
+
+    @njit(cache=True)
+    def is_monotone_decreasing(a, tol=1e-10):
+        """True if a[i] - a[i-1] <= tol everywhere; one pass, stops at the first rise."""
+        for i in range(1, a.shape[0]):
+            if not (a[i] - a[i - 1] <= tol):
+                return False
+        return True
+else:
+    def is_monotone_decreasing(a, tol=1e-10):
+        """True if a[i] - a[i-1] <= tol everywhere."""
+        return bool(np.all(np.diff(a) <= tol))
+
+    def oscillatory_kernel(t):
+        return np.sin(2.0 * t) * np.exp(-0.3 * t) + 0.5 * np.cos(1.5 * t)
+
+    def discontinuous_kernel(t):
+        """Kernel that changes behavior at t=2 and t=5."""
+        t = np.asarray(t, dtype=float)
+        return np.where(t < 2, np.exp(-0.5 * t),
+                        np.where(t < 5, 0.5 * np.exp(-0.2 * t), 0.1 * np.exp(-0.1 * t)))
+
+
+@lru_cache(maxsize=None)
+def _interned_power_law(alpha, gamma):
+    return Kernel.power_law(alpha=alpha, gamma=gamma)
+
+
+def power_law_kernel(alpha, gamma=1.0):
+    """Kernel.power_law shared across tests, so equal parameters give the same object."""
+    return _interned_power_law(float(alpha), float(gamma))
+
 
 def test_basic_kernel_creation():
     """Test creation of standard kernel types."""
@@ -31,19 +95,34 @@ def test_basic_kernel_creation():
 
     kernels = [
         ("Exponential", Kernel.exponential(gamma=1.5)),
-        ("Power-law (α=0.6)", Kernel.power_law(alpha=0.6, gamma=1.0)),
-        ("Power-law (α=0.8)", Kernel.power_law(alpha=0.8, gamma=1.0)),
+        ("Power-law (α=0.6)", power_law_kernel(0.6)),
+        ("Power-law (α=0.8)", power_law_kernel(0.8)),
         ("Tempered power-law", Kernel.tempered_power_law(alpha=0.7, beta=0.3)),
     ]
 
-    for name, kernel in kernels:
-        # Test evaluation at sample points
-        t_test = np.array([0.1, 1.0, 5.0])
-        values = kernel(t_test)
+    # Evaluate all kernels at the sample points in one batched call
+    t_test = np.array([0.1, 1.0, 5.0])
+    all_values = Kernel.batch_eval([kernel for _, kernel in kernels], t_test)
 
+    for (name, _), values in zip(kernels, all_values):
         print(f"{name:25} | K(0.1)={values[0]:6.3f}, K(1)={values[1]:6.3f}, K(5)={values[2]:6.3f}")
 
-    return True
+    # Batched values must match direct calls; a custom kernel that borrows a
+    # built-in name is called through its own func, not rebuilt from params
+    impostor = Kernel(lambda t: np.exp(-2.0 * t), name="PowerLaw", params={"alpha": 0.5, "gamma": 1.0})
+    checked = [kernel for _, kernel in kernels] + [impostor]
+    batched = Kernel.batch_eval(checked, t_test)
+    direct = np.array([kernel(t_test) for kernel in checked])
+    print(f"batch_eval matches direct evaluation: {np.allclose(batched, direct)}")
+
+    # Float32 input stays float32, including the t^0 and sqrt fast paths
+    t32 = t_test.astype(np.float32)
+    float32_kernels = [Kernel.exponential(), power_law_kernel(1.0), power_law_kernel(0.5),
+                       Kernel.tempered_power_law(alpha=1.0, beta=0.3)]
+    keeps_float32 = all(kernel(t32).dtype == np.float32 for kernel in float32_kernels)
+    print(f"float32 input keeps float32: {keeps_float32}")
+
+    return bool(np.allclose(batched, direct)) and keeps_float32
 
 
 def test_volterra_solution_accuracy():
@@ -61,23 +140,34 @@ def test_volterra_solution_accuracy():
     print(f"Exponential kernel (γ=1.0):")
     print(f"  x(0)={x[0]:.6f} (should be 1.0)")
     print(f"  x(5)={x[-1]:.6f} (should be small > 0)")
-    print(f"  Monotonic: {np.all(np.diff(x) <= 1e-10)}")
+    print(f"  Monotonic: {is_monotone_decreasing(x)}")
     print(f"  n(t) final: {n[-1]:.3f}")
 
     # Для степенного ядра
-    kernel_pl = Kernel.power_law(alpha=0.7, gamma=1.0)
+    kernel_pl = power_law_kernel(0.7)
     t, x, n = project_kernel_to_n(kernel_pl, t_max=10.0, n_points=500)
 
     print(f"\nPower-law kernel (α=0.7):")
-    print(f"  Monotonic: {np.all(np.diff(x) <= 1e-10)}")
+    print(f"  Monotonic: {is_monotone_decreasing(x)}")
     print(f"  x(10)={x[-1]:.6f}")
     print(f"  n(10)={n[-1]:.3f}")
 
     # Основной критерий: монотонное убывание к 0
     success = (x[0] > 0.99 and x[-1] > 0 and
-               np.all(np.diff(x) <= 1e-10) and
+               is_monotone_decreasing(x) and
                np.abs(n[0]) < 1e-10)
 
+    # C++ overloads: float32 rows reach the float solver, anything else is
+    # converted to double
+    from src.kernel_experience import solvers
+    if solvers.HAS_CPP:
+        K_row = np.exp(-np.linspace(0.0, 5.0, 200))
+        overload_dtypes = [solvers.solve_volterra_cpp(row, 5.0, 200)[1].dtype
+                           for row in (K_row.astype(np.float32), K_row, np.ones(200, dtype=np.int64))]
+        print(f"\nC++ overload result dtypes (float32, float64, int64 rows): "
+              f"{[dtype.name for dtype in overload_dtypes]}")
+        success = success and overload_dtypes == [np.float32, np.float64, np.float64]
+
     return success
 
 
@@ -88,34 +178,39 @@ def test_projection_consistency():
     print("=" * 50)
 
     test_kernels = [
-        ("Power-law α=0.6", Kernel.power_law(alpha=0.6)),
-        ("Power-law α=0.8", Kernel.power_law(alpha=0.8)),
+        ("Power-law α=0.6", power_law_kernel(0.6)),
+        ("Power-law α=0.8", power_law_kernel(0.8)),
         ("Tempered α=0.7, β=0.2", Kernel.tempered_power_law(alpha=0.7, beta=0.2)),
     ]
 
     lambda_param = 0.85
+    # Log-domain differences are well conditioned, so float32 is enough here
+    log_lambda = np.float32(math.log(lambda_param))
     results = []
 
     for name, kernel in test_kernels:
         t, x, n = project_kernel_to_n(kernel, lambda_param=lambda_param,
                                       t_max=8.0, n_points=800)
 
-        # Reconstruct x(t) from n(t): x_rec = x0 * λ^n(t)
-        x_reconstructed = np.exp(n * np.log(lambda_param))
+        # Reconstruct x(t) from n(t): log(x_rec / x0) = n(t)·log(λ),
+        # compared with the normalized original in the log domain
+        log_x = np.log((x / x[0]).astype(np.float32))
+        metrics = compute_accuracy_log(log_x, n.astype(np.float32) * log_lambda)
 
-        # Compare with original (normalized)
-        x_norm = x / x[0]
-        metrics = compute_accuracy(x_norm, x_reconstructed)
+        # Cross-check against the linear-domain metric on x_rec = λ^n(t)
+        linear = compute_accuracy(x / x[0], np.exp(n * math.log(lambda_param)))
+        metrics_agree = abs(linear['mean_error'] - metrics['mean_error']) < 1e-6
 
-        results.append((name, metrics['accuracy']))
+        results.append((name, metrics['accuracy'], metrics_agree))
 
         print(f"{name:25} | Accuracy: {metrics['accuracy'] * 100:6.2f}% | "
-              f"Avg error: {metrics['mean_error'] * 100:6.3f}%")
+              f"Avg error: {metrics['mean_error'] * 100:6.3f}% | "
+              f"Max |Δlog|: {metrics['max_log_error']:.1e}")
 
-    avg_accuracy = np.mean([r[1] for r in results])
+    avg_accuracy = sum(r[1] for r in results) / len(results)
     print(f"\n{'Average accuracy':25} | {avg_accuracy * 100:6.2f}%")
 
-    return avg_accuracy > 0.95
+    return avg_accuracy > 0.95 and all(r[2] for r in results)
 
 
 def test_oscillatory_kernel_handling():
@@ -124,10 +219,7 @@ def test_oscillatory_kernel_handling():
     print("TEST 4: Oscillatory Kernels")
     print("=" * 50)
 
-    # Define an oscillatory kernel (realistic for some physical systems)
-    def oscillatory_kernel(t):
-        return np.sin(2.0 * t) * np.exp(-0.3 * t) + 0.5 * np.cos(1.5 * t)
-
+    # Oscillatory kernel (realistic for some physical systems), defined above
     kernel = Kernel(oscillatory_kernel, name="OscillatoryExample")
 
     # Project with complex output allowed
@@ -140,11 +232,13 @@ def test_oscillatory_kernel_handling():
     print(f"Oscillatory kernel analysis:")
     print(f"  Solution has imaginary part: {np.any(np.abs(x.imag) > 1e-10)}")
     print(f"  Max |Im(x)|: {np.max(np.abs(x.imag)):.2e}")
-    print(f"  Envelope n(t) monotonic: {np.all(np.diff(n_env) <= 1e-10)}")
+    print(f"  Envelope n(t) monotonic: {is_monotone_decreasing(n_env)}")
     print(f"  Final envelope value: {n_env[-1]:.3f}")
 
     # Visualize (optional - uncomment for plots)
-    if False:  # Set to True to see plots
+    if PLOT_ENABLED:
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(12, 4))
 
         plt.subplot(131)
@@ -178,40 +272,45 @@ def test_performance_benchmark():
     print("TEST 5: Performance Benchmark")
     print("=" * 50)
 
-    kernel = Kernel.power_law(alpha=0.7)
+    kernel = power_law_kernel(0.7)
     grid_sizes = [100, 500, 1000, 2000]
+    # The 1% thresholds below do not need float64: compare in float32
+    log_lambda = np.float32(math.log(0.8))
 
-    print("Grid size | Time (s) | Accuracy | x(final)")
-    print("-" * 45)
+    # Each grid size is solved independently. Its timing is the mean of
+    # `repeats` calls after one untimed warm-up, measured with the
+    # high-resolution perf_counter_ns clock.
+    repeats = 5
+    print("Grid size | Time (ms) | Accuracy | x(final)")
+    print("-" * 46)
 
     times = []
     final_values = []
 
     for n_points in grid_sizes:
-        start_time = time()
-
-        t, x, n = project_kernel_to_n(kernel, t_max=10.0, n_points=n_points)
+        project_kernel_to_n(kernel, t_max=10.0, n_points=n_points)  # warm-up
+        start_ns = perf_counter_ns()
+        for _ in range(repeats):
+            t, x, n = project_kernel_to_n(kernel, t_max=10.0, n_points=n_points)
+        elapsed = (perf_counter_ns() - start_ns) * 1e-9 / repeats
 
-        # Reconstruct and compute accuracy
-        x_reconstructed = np.exp(n * np.log(0.8))
-        metrics = compute_accuracy(x / x[0], x_reconstructed)
-
-        elapsed = time() - start_time
+        # Reconstruct and compare in the log domain
+        log_x = np.log((x / x[0]).astype(np.float32))
+        metrics = compute_accuracy_log(log_x, n.astype(np.float32) * log_lambda)
 
         times.append(elapsed)
         final_values.append(x[-1])
 
-        print(f"{n_points:9d} | {elapsed:8.3f} | {metrics['accuracy'] * 100:7.2f}% | {x[-1]:8.6f}")
+        print(f"{n_points:9d} | {elapsed * 1e3:9.3f} | {metrics['accuracy'] * 100:7.2f}% | {x[-1]:8.6f}")
 
     # Check consistency: final values should be similar
     final_std = np.std(final_values)
     print(f"\nStd of x(final) across grid sizes: {final_std:.6f}")
 
     # Performance should scale roughly as O(n²)
-    if len(times) >= 3:
-        ratio = times[-1] / times[0]
-        expected_ratio = (grid_sizes[-1] / grid_sizes[0]) ** 2
-        print(f"Time ratio ({grid_sizes[-1]}/{grid_sizes[0]}): {ratio:.1f} (expected ~{expected_ratio:.1f})")
+    ratio = times[-1] / times[0]
+    expected_ratio = (grid_sizes[-1] / grid_sizes[0]) ** 2
+    print(f"Time ratio ({grid_sizes[-1]}/{grid_sizes[0]}): {ratio:.1f} (expected ~{expected_ratio:.1f})")
 
     return final_std < 0.01  # Final values consistent within 1%
 
@@ -222,22 +321,7 @@ def test_custom_kernel_interface():
     print("TEST 6: Custom Kernel Interface")
     print("=" * 50)
 
-    # Векторизованная версия
-    def discontinuous_kernel(t):
-        """Kernel that changes behavior at t=2 and t=5."""
-        t = np.asarray(t)
-        result = np.zeros_like(t)
-
-        mask1 = t < 2
-        mask2 = (t >= 2) & (t < 5)
-        mask3 = t >= 5
-
-        result[mask1] = 1.0 * np.exp(-0.5 * t[mask1])
-        result[mask2] = 0.5 * np.exp(-0.2 * t[mask2])
-        result[mask3] = 0.1 * np.exp(-0.1 * t[mask3])
-
-        return result
-
+    # Discontinuous kernel, defined above
     kernel = Kernel(discontinuous_kernel, name="DiscontinuousRegime")
 
     # Test projection
@@ -249,13 +333,134 @@ def test_custom_kernel_interface():
     print(f"  Number of time points: {len(t)}")
 
     # Verify kernel evaluation
-    test_points = [1.9, 2.0, 2.1, 4.9, 5.0, 5.1]
+    test_points = np.array([1.9, 2.0, 2.1, 4.9, 5.0, 5.1])
     values = kernel(test_points)
 
-    for tp, val in zip(test_points, values):
-        print(f"  K({tp:.1f}) = {val:.3f}")
+    print("\n".join(f"  K({tp:.1f}) = {val:.3f}" for tp, val in zip(test_points.tolist(), values.tolist())))
+
+    # A custom kernel that borrows a built-in name must still be solved from its func
+    impostor = Kernel(lambda t: np.exp(-2.0 * t), name="Exponential", params={"gamma": 1.0})
+    _, x_impostor = solve_volterra(impostor, t_max=10.0, n_points=500)
+    _, x_generic = solve_volterra(lambda t: np.exp(-2.0 * t), t_max=10.0, n_points=500)
+    own_func = impostor.family is None and np.allclose(x_impostor, x_generic)
+    print(f"  Custom kernel named 'Exponential' solved from its own func: {own_func}")
+
+    return own_func
+
+
+def test_kernel_batch_sweep():
+    """Test that a KernelBatch sweep matches solving each kernel separately."""
+    print("\n" + "=" * 50)
+    print("TEST 7: Kernel Batch Sweep")
+    print("=" * 50)
+
+    alphas = np.linspace(0.4, 0.9, 6)
+    batch = KernelBatch("TemperedPowerLaw", alphas=alphas, betas=0.2)
+    t, x_batch = solve_volterra_batch(batch, t_max=10.0, n_points=400)
+
+    max_diff = 0.0
+    x_singles = np.empty_like(x_batch)
+    for i, alpha in enumerate(alphas):
+        _, x_singles[i] = solve_volterra(batch[i], t_max=10.0, n_points=400)
+        diff = np.max(np.abs(x_batch[i] - x_singles[i]))
+        max_diff = max(max_diff, diff)
+        print(f"α={alpha:.2f} | x(10)={x_batch[i, -1]:.6f} | diff vs single solve: {diff:.2e}")
+
+    # compute_accuracy works on whole (M, N) batches, including square ones
+    metrics = compute_accuracy(x_batch, x_singles)
+    square = compute_accuracy(x_batch[:, :len(alphas)], x_singles[:, :len(alphas)])
+    print(f"Batch accuracy (M×N): {metrics['accuracy'] * 100:.2f}% | "
+          f"RMSE: {metrics['rmse']:.1e} | square block RMSE: {square['rmse']:.1e}")
+
+    # Exponential rows take the same closed form as solve_volterra
+    gammas = np.array([0.5, 1.0, 2.0, -0.5])
+    exp_batch = KernelBatch("Exponential", gammas=gammas)
+    _, x_exp = solve_volterra_batch(exp_batch, t_max=10.0, n_points=400)
+    exp_diff = max(np.max(np.abs(x_exp[i] - solve_volterra(exp_batch[i], t_max=10.0, n_points=400)[1]))
+                   for i in range(len(gammas)))
+    print(f"Exponential batch γ={gammas.tolist()} | max diff vs single solve: {exp_diff:.2e}")
+
+    return (x_batch.shape == (len(alphas), len(t)) and max_diff < 1e-10
+            and metrics['rmse'] < 1e-10 and square['rmse'] < 1e-10 and exp_diff < 1e-10)
+
+
+def test_log_accuracy_paths():
+    """Test compute_accuracy_log (fused numba pass for float64) against plain NumPy."""
+    print("\n" + "=" * 50)
+    print("TEST 8: Log-domain Accuracy")
+    print("=" * 50)
+
+    rng = np.random.default_rng(0)
+    log_x = np.log(rng.uniform(0.05, 1.0, 5000))
+    log_rec = log_x + rng.normal(0.0, 1e-3, log_x.size)
+
+    passed = True
+    for dtype in (np.float64, np.float32):
+        a, b = log_x.astype(dtype), log_rec.astype(dtype)
+        metrics = compute_accuracy_log(a, b)
+        diff = b.astype(np.float64) - a.astype(np.float64)
+        rel = np.abs(np.expm1(diff))
+        tol = 1e-12 if dtype == np.float64 else 1e-6
+        errors = [abs(metrics['mean_error'] - rel.mean()),
+                  abs(metrics['max_error'] - rel.max()),
+                  abs(metrics['max_log_error'] - np.abs(diff).max())]
+        print(f"{np.dtype(dtype).name:8} | mean error: {metrics['mean_error']:.6e} | "
+              f"max deviation from NumPy: {max(errors):.1e}")
+        passed = passed and max(errors) < tol
+
+    return passed
+
+
+def test_convolution_quadrature():
+    """Test solve_volterra_cq against exact solutions and its fallback rules."""
+    print("\n" + "=" * 50)
+    print("TEST 9: Convolution Quadrature")
+    print("=" * 50)
+
+    # K = e^{-2t}: x' = -3x + 2 gives x = (2 + e^{-3t}) / 3. A custom kernel,
+    # so the CQ path runs instead of the built-in exponential closed form.
+    kernel = Kernel(lambda t: np.exp(-2 * t), name="Exp2",
+                    laplace=lambda s: 1 / (s + 2),
+                    integral=lambda t: -np.expm1(-2 * t) / 2)
+    t, x = solve_volterra_cq(kernel, t_max=10.0, n_points=2001)
+    exp_error = np.max(np.abs(x - (2 + np.exp(-3 * t)) / 3))
+    print(f"Exponential | max error vs exact: {exp_error:.2e}")
+
+    # Power law: x = E_α(-t^α), summed as a Mittag-Leffler series in the log domain
+    alpha = 0.7
+    t, x = solve_volterra_cq(Kernel.power_law(alpha), t_max=10.0, n_points=2001)
+    k = np.arange(300)
+    log_gamma = np.array([math.lgamma(alpha * j + 1) for j in k])
+    z = np.maximum(t[:, None] ** alpha, 1e-300)
+    exact = np.sum((-1.0) ** k * np.exp(k * np.log(z) - log_gamma), axis=1)
+    exact[0] = 1.0
+    ml_error = np.max(np.abs(x - exact))
+    print(f"PowerLaw α={alpha} | max error vs Mittag-Leffler: {ml_error:.2e}")
+
+    # Growing kernels are not convolution-solvable: the opt-in FFT projection
+    # falls back to solve_volterra
+    fallback_ok = True
+    for growing in (Kernel.exponential(-0.5), Kernel.tempered_power_law(0.6, -0.1)):
+        _, x_proj, _ = project_kernel_to_n_fft(growing, t_max=10.0, n_points=500)
+        _, x_direct = solve_volterra(growing, t_max=10.0, n_points=500)
+        same = not growing.is_convolution and np.allclose(x_proj, x_direct)
+        print(f"{growing.name} {growing.params} | FFT path: {growing.is_convolution} | "
+              f"matches solve_volterra: {same}")
+        fallback_ok = fallback_ok and same
+
+    return exp_error < 1e-4 and ml_error < 1e-4 and fallback_ok
+
+
+def _run_test(test_func, capture=False):
+    """Run one test; returns (passed, captured output, error message or None)."""
+    buffer = io.StringIO()
+    try:
+        with redirect_stdout(buffer) if capture else nullcontext():
+            passed = bool(test_func())
+        return passed, buffer.getvalue(), None
+    except Exception as e:
+        return False, buffer.getvalue(), str(e)
 
-    return True
 
 def main():
     """Run all tests and provide summary."""
@@ -273,23 +478,40 @@ def main():
         ("Oscillatory Handling", test_oscillatory_kernel_handling),
         ("Performance", test_performance_benchmark),
         ("Custom Kernels", test_custom_kernel_interface),
+        ("Kernel Batch", test_kernel_batch_sweep),
+        ("Log Accuracy", test_log_accuracy_paths),
+        ("Convolution Quadrature", test_convolution_quadrature),
     ]
 
+    # Independent tests run in worker processes with their output captured;
+    # the benchmark runs afterwards in this process so its timings are not
+    # disturbed by the other tests.
+    serial_tests = {"Performance"}
+    workers = min(len(tests) - len(serial_tests), os.cpu_count() or 1)
+    outcomes = {}
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {test_name: executor.submit(_run_test, test_func, True)
+                       for test_name, test_func in tests if test_name not in serial_tests}
+            outcomes = {test_name: future.result() for test_name, future in futures.items()}
+
     all_passed = True
     for test_name, test_func in tests:
-        try:
-            print(f"\n🔍 Running: {test_name}")
-            passed = test_func()
-            test_results[test_name] = passed
+        print(f"\n🔍 Running: {test_name}")
+        if test_name in outcomes:
+            passed, output, error = outcomes[test_name]
+            print(output, end="")
+        else:
+            passed, output, error = _run_test(test_func)
+        test_results[test_name] = passed
+
+        if error is not None:
+            print(f"   ⚠️  ERROR: {error}")
+        else:
             status = "✅ PASS" if passed else "❌ FAIL"
             print(f"   Result: {status}")
 
-            if not passed:
-                all_passed = False
-
-        except Exception as e:
-            print(f"   ⚠️  ERROR: {e}")
-            test_results[test_name] = False
+        if not passed:
             all_passed = False
 
     # Summary